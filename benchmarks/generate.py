@@ -0,0 +1,184 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+"""Generators for synthetic metadata and policies used by the benchmarks.
+
+The metadata is modeled on ``examples/data/hermes.ttl``: ``schema:SoftwareSourceCode``
+records whose authors are ``schema:Person``s with an affiliation. The policies are
+parameterizable shapes like the ones in ``examples/policies``. Everything is written to
+local files, so that the benchmarks run offline.
+"""
+
+import random
+from pathlib import Path
+from typing import Tuple
+
+import toml
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import RDF
+from rdflib.namespace import SDO as SCHEMA
+
+LICENSES = [
+    "https://spdx.org/licenses/Apache-2.0",
+    "https://spdx.org/licenses/GPL-3.0-or-later",
+    "https://spdx.org/licenses/MIT",
+    "https://spdx.org/licenses/BSD-3-Clause",
+    "https://spdx.org/licenses/MPL-2.0",
+]
+
+GIVEN_NAMES = ["Jane", "Michael", "Stephan", "Jeffrey", "Oliver", "David", "Anna"]
+FAMILY_NAMES = ["Meinel", "Druskat", "Kelling", "Bertuch", "Knodel", "Pape", "Doe"]
+ORGANIZATIONS = [
+    "German Aerospace Center (DLR)",
+    "Helmholtz-Zentrum Dresden-Rossendorf (HZDR)",
+    "Forschungszentrum Jülich GmbH (FZJ)",
+]
+
+
+def generate_data_graph(records: int, authors: int, seed: int = 0) -> Graph:
+    """Generate ``records`` software publications with ``authors`` authors each.
+
+    Some of the records deliberately breach the generated policies, so that the
+    validation reports are not empty.
+    """
+    rng = random.Random(seed)
+    graph = Graph()
+    for i in range(records):
+        software = URIRef(f"https://example.org/software/{i}")
+        graph.add((software, RDF.type, SCHEMA.SoftwareSourceCode))
+        graph.add((software, SCHEMA.name, Literal(f"Software {i}")))
+        description = "A synthetic software publication. " * rng.randint(1, 40)
+        graph.add((software, SCHEMA.description, Literal(description.strip())))
+        graph.add((software, SCHEMA.license, Literal(rng.choice(LICENSES))))
+        graph.add((software, SCHEMA.version, Literal(f"{i % 3}.{i % 7}.{i % 11}")))
+        graph.add(
+            (
+                software,
+                SCHEMA.codeRepository,
+                Literal(f"https://example.org/git/{i}", datatype=SCHEMA.URL),
+            )
+        )
+        for j in range(authors):
+            person = URIRef(f"https://example.org/person/{i}-{j}")
+            affiliation = BNode()
+            graph.add((software, SCHEMA.author, person))
+            graph.add((person, RDF.type, SCHEMA.Person))
+            graph.add((person, SCHEMA.givenName, Literal(rng.choice(GIVEN_NAMES))))
+            graph.add((person, SCHEMA.familyName, Literal(rng.choice(FAMILY_NAMES))))
+            graph.add((person, SCHEMA.email, Literal(f"person-{i}-{j}@example.org")))
+            graph.add((person, SCHEMA.affiliation, affiliation))
+            graph.add((affiliation, RDF.type, SCHEMA.Organization))
+            graph.add(
+                (affiliation, SCHEMA.legalName, Literal(rng.choice(ORGANIZATIONS)))
+            )
+    return graph
+
+
+_PREAMBLE = """\
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix sc: <https://schema.software-metadata.pub/software-card/2025-01/#> .
+@prefix schema: <https://schema.org/> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix bench: <https://example.org/benchmark/#> .
+"""
+
+_DESCRIPTION_POLICY = """
+bench:minLength{i} a sc:Parameter ;
+    sc:parameterOuterType sc:Scalar ;
+    sc:parameterInnerType xsd:integer ;
+    sc:parameterConfigPath "min_length" ;
+    sc:parameterDefaultValue 50 .
+
+bench:description{i} a sh:NodeShape ;
+    sh:targetClass schema:SoftwareSourceCode ;
+    sh:property [
+        sh:name "Long description {i}" ;
+        sh:description "The software description must have a certain length." ;
+        sh:path schema:description ;
+        sh:datatype xsd:string ;
+        sh:minLength bench:minLength{i} ;
+    ] .
+"""
+
+_LICENSE_POLICY = """
+bench:licenses{i} a sc:Parameter ;
+    sc:parameterOuterType rdf:List ;
+    sc:parameterInnerType xsd:anyURI ;
+    sc:parameterConfigPath "licenses" ;
+    sc:parameterDefaultValue ( "https://spdx.org/licenses/Apache-2.0" ) .
+
+bench:license{i} a sh:NodeShape ;
+    sh:targetClass schema:SoftwareSourceCode ;
+    sh:property [
+        sh:name "Suggested license {i}" ;
+        sh:description "A license from this list should be chosen." ;
+        sh:severity sh:Warning ;
+        sh:path schema:license ;
+        sh:datatype xsd:string ;
+        sh:in bench:licenses{i} ;
+    ] .
+"""
+
+_AUTHOR_POLICY = """
+bench:givenNames{i} a sc:Parameter ;
+    sc:parameterOuterType rdf:List ;
+    sc:parameterInnerType xsd:string ;
+    sc:parameterConfigPath "given_names" ;
+    sc:parameterDefaultValue ( "Jane" ) .
+
+bench:author{i} a sh:NodeShape ;
+    sh:targetClass schema:SoftwareSourceCode ;
+    sh:property [
+        sh:name "Named authors {i}" ;
+        sh:description "Every author must be a person with a known given name." ;
+        sh:severity sh:Info ;
+        sh:path schema:author ;
+        sh:class schema:Person ;
+        sh:node [
+            sh:property [
+                sh:path schema:givenName ;
+                sh:minCount 1 ;
+                sh:in bench:givenNames{i} ;
+            ] ;
+        ] ;
+    ] .
+"""
+
+
+def _policy(i: int) -> Tuple[str, dict]:
+    kind = i % 3
+    if kind == 0:
+        return _DESCRIPTION_POLICY.format(i=i), {"min_length": 200 + i}
+    if kind == 1:
+        return _LICENSE_POLICY.format(i=i), {"licenses": LICENSES[: 1 + i % 4]}
+    return _AUTHOR_POLICY.format(i=i), {"given_names": GIVEN_NAMES[: 2 + i % 5]}
+
+
+def write_benchmark_files(
+    directory: Path, records: int, authors: int, policies: int, seed: int = 0
+) -> Tuple[Path, Path]:
+    """Write a data file, ``policies`` policy files and a config into ``directory``.
+
+    Returns the paths of the data file and the config file.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    data_file = directory / "data.nt"
+    generate_data_graph(records, authors, seed=seed).serialize(
+        data_file, format="nt", encoding="utf-8"
+    )
+
+    config = {"policies": {}}
+    for i in range(policies):
+        policy, parameters = _policy(i)
+        policy_file = directory / f"policy-{i}.ttl"
+        policy_file.write_text(_PREAMBLE + policy, encoding="utf-8")
+        config["policies"][f"policy-{i}"] = {
+            "source": str(policy_file.resolve()),
+            # Leave some of the parameters at their default values.
+            "parameters": parameters if i % 4 else {},
+        }
+    config_file = directory / "config.toml"
+    config_file.write_text(toml.dumps(config), encoding="utf-8")
+    return data_file, config_file
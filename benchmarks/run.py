@@ -0,0 +1,261 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+"""Time the phases of the validation pipeline on synthetic data.
+
+Each phase is run ``--repeat`` times and once more while tracing memory allocations.
+The results are printed and stored as JSON in ``benchmarks/results``, so that they can
+be compared with the results of other versions using ``--compare``.
+
+Run from the repository root, e.g.::
+
+    python benchmarks/run.py --records 100 --authors 20 --policies 30
+"""
+
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from importlib.metadata import version as package_version
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from software_card_policies import __version__
+from software_card_policies.config import make_config
+from software_card_policies.data_model import (
+    clear_caches,
+    make_shacl_graph,
+    parameterize_graph,
+    read_rdf_resource,
+    validate_graph,
+)
+from software_card_policies.fetch import Fetcher
+from software_card_policies.report import (
+    JSONLinesReportWriter,
+    create_report,
+    iter_validation_results,
+    read_validation_conforms,
+    read_validation_report,
+)
+
+sys.path.insert(0, str(Path(__file__).parent))
+from generate import write_benchmark_files  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def measure(
+    run: Callable[[], Any], setup: Callable[[], tuple] = tuple, repeat: int = 3
+) -> Dict[str, float]:
+    """Time ``run`` and record the peak memory it allocates.
+
+    ``setup`` is called before every run and its result is passed to ``run``. It is
+    neither timed nor traced.
+    """
+    timings = []
+    for _ in range(repeat):
+        arguments = setup()
+        start = time.perf_counter()
+        run(*arguments)
+        timings.append(time.perf_counter() - start)
+
+    arguments = setup()
+    tracemalloc.start()
+    try:
+        run(*arguments)
+        _size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "min_seconds": min(timings),
+        "median_seconds": statistics.median(timings),
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_benchmarks(data_file: Path, config_file: Path, repeat: int) -> Dict[str, Any]:
+    config = make_config(config_file=config_file)
+    fetcher = Fetcher()
+    phases = {}
+
+    data_graph = read_rdf_resource(data_file)
+    phases["read_rdf_resource"] = measure(
+        lambda: read_rdf_resource(data_file), repeat=repeat
+    )
+    phases["read_rdf_resource"]["triples_per_second"] = (
+        len(data_graph) / phases["read_rdf_resource"]["min_seconds"]
+    )
+
+    policy_sources = [
+        (Path(policy.source).read_bytes(), policy.parameters)
+        for policy in config.policies.values()
+    ]
+
+    def parse_policies():
+        return (
+            [
+                (read_rdf_resource(format="turtle", data=data), parameters)
+                for data, parameters in policy_sources
+            ],
+        )
+
+    def parameterize_policies(policies):
+        for policy_graph, parameters in policies:
+            parameterize_graph(policy_graph, parameters)
+
+    phases["parameterize_graph"] = measure(
+        parameterize_policies, setup=parse_policies, repeat=repeat
+    )
+
+    def make_shapes_graph():
+        # Start without compiled policies, as on the first run of the program.
+        clear_caches()
+        return make_shacl_graph(config, fetcher=fetcher)
+
+    phases["make_shacl_graph"] = measure(make_shapes_graph, repeat=repeat)
+    phases["make_shacl_graph"]["policies_per_second"] = (
+        len(config.policies) / phases["make_shacl_graph"]["min_seconds"]
+    )
+    shapes_graph = make_shapes_graph()
+
+    def clear_graph_caches():
+        # Verify the shapes graph and index its targets on every run, as on the first
+        # validation of the program.
+        clear_caches()
+        return ()
+
+    phases["validate_graph"] = measure(
+        lambda: validate_graph(data_graph, shapes_graph),
+        setup=clear_graph_caches,
+        repeat=repeat,
+    )
+    phases["validate_graph"]["triples_per_second"] = (
+        len(data_graph) / phases["validate_graph"]["min_seconds"]
+    )
+    _conforms, validation_graph = validate_graph(data_graph, shapes_graph)
+
+    results = len(read_validation_report(validation_graph).results)
+    phases["read_validation_report"] = measure(
+        lambda: read_validation_report(validation_graph), repeat=repeat
+    )
+    phases["create_report"] = measure(
+        lambda: create_report(validation_graph), repeat=repeat
+    )
+
+    def write_json_lines():
+        writer = JSONLinesReportWriter(StringIO())
+        writer.start()
+        writer.write_report(
+            "data.nt",
+            read_validation_conforms(validation_graph),
+            iter_validation_results(validation_graph),
+        )
+        writer.finish()
+
+    phases["write_json_lines"] = measure(write_json_lines, repeat=repeat)
+    for phase in ("read_validation_report", "create_report", "write_json_lines"):
+        phases[phase]["results_per_second"] = results / phases[phase]["min_seconds"]
+
+    return {
+        "data_triples": len(data_graph),
+        "shapes_triples": len(shapes_graph),
+        "validation_results": results,
+        "phases": phases,
+    }
+
+
+def print_results(results: Dict[str, Any], baseline: Dict[str, Any] | None) -> None:
+    print(
+        f"{results['data_triples']} data triples, {results['shapes_triples']} shapes "
+        f"triples, {results['validation_results']} validation results"
+    )
+    for phase, measurement in results["phases"].items():
+        line = (
+            f"{phase:24} {measurement['min_seconds']:10.4f} s "
+            f"{measurement['peak_memory_bytes'] / 2**20:10.1f} MiB"
+        )
+        if baseline is not None and phase in baseline["phases"]:
+            before = baseline["phases"][phase]
+            time_ratio = measurement["min_seconds"] / before["min_seconds"]
+            memory_ratio = measurement["peak_memory_bytes"] / max(
+                before["peak_memory_bytes"], 1
+            )
+            line += f"   time x{time_ratio:.2f}, memory x{memory_ratio:.2f}"
+        print(line)
+
+
+def make_argument_parser() -> ArgumentParser:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--records", type=int, default=20, help="number of software publications"
+    )
+    parser.add_argument(
+        "--authors", type=int, default=10, help="number of authors per publication"
+    )
+    parser.add_argument(
+        "--policies", type=int, default=12, help="number of generated policies"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="number of timed runs of each phase"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="file to store the results in (the default is a new file in results/)",
+    )
+    parser.add_argument(
+        "--compare", type=Path, help="results of a previous run to compare with"
+    )
+    return parser
+
+
+def main():
+    arguments = make_argument_parser().parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_file, config_file = write_benchmark_files(
+            Path(directory), arguments.records, arguments.authors, arguments.policies
+        )
+        results = run_benchmarks(data_file, config_file, arguments.repeat)
+
+    results = {
+        "version": __version__,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "rdflib": package_version("rdflib"),
+        "pyshacl": package_version("pyshacl"),
+        "parameters": {
+            "records": arguments.records,
+            "authors": arguments.authors,
+            "policies": arguments.policies,
+            "repeat": arguments.repeat,
+        },
+        **results,
+    }
+
+    baseline = None
+    if arguments.compare is not None:
+        baseline = json.loads(arguments.compare.read_text())
+        if baseline["parameters"] != results["parameters"]:
+            print("Warning: the compared results were created with other parameters")
+    print_results(results, baseline)
+
+    output = arguments.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        output = RESULTS_DIR / f"{__version__}-{timestamp}.json"
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+"""Check that the command line program starts quickly.
+
+Fails if importing ``software_card_policies.__main__`` pulls in rdflib or pyshacl, or if
+``software-card-validate --version`` takes longer than ``--max-seconds``.
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+
+HEAVY_MODULES = ("rdflib", "pyshacl", "pyduktape2")
+
+_CHECK_IMPORTS = f"""
+import json, sys
+import software_card_policies.__main__
+print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))
+"""
+
+
+def imported_heavy_modules() -> list:
+    output = subprocess.run(
+        [sys.executable, "-c", _CHECK_IMPORTS],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def startup_seconds(repeat: int) -> float:
+    """Return the median time of running ``software-card-validate --version``."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "software_card_policies", "--version"],
+            check=True,
+            capture_output=True,
+        )
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=0.5,
+        help="maximum accepted startup time (the default is 0.5)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="number of timed runs (the default is 5)"
+    )
+    arguments = parser.parse_args()
+
+    failed = False
+    if heavy_modules := imported_heavy_modules():
+        print(f"Imported at startup: {', '.join(heavy_modules)}")
+        failed = True
+    seconds = startup_seconds(arguments.repeat)
+    print(f"Startup time: {seconds:.3f} s")
+    if seconds > arguments.max_seconds:
+        print(f"Startup is slower than {arguments.max_seconds} s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,28 @@
 # SPDX-License-Identifier: Apache-2.0
 # SPDX-FileContributor: David Pape
 
+import cProfile
+import glob
+import json
+import logging
 import sys
 from argparse import ArgumentError, ArgumentParser, ArgumentTypeError
+from itertools import chain
 from pathlib import Path
+from typing import List
 from urllib.parse import urlparse
 
+# Only lightweight modules are imported here, so that ``--help``, ``--version`` and
+# errors in the arguments or the config don't have to wait for rdflib and pyshacl.
+# Everything else is imported once it is needed.
 from software_card_policies import __version__ as version
+from software_card_policies.arguments import positive_int
+from software_card_policies.cache import FileCache, default_cache_dir
 from software_card_policies.config import make_config
-from software_card_policies.data_model import (
-    make_shacl_graph,
-    read_rdf_resource,
-    validate_graph,
-)
-from software_card_policies.report import create_report
+from software_card_policies.tracing import Tracer, span, tracing
+
+# The formats of `software_card_policies.report.make_report_writer`
+REPORT_FORMATS = ("text", "jsonl", "sarif")
 
 
 def _path_or_url(path: str) -> Path | str:
@@ -26,6 +35,24 @@ def _path_or_url(path: str) -> Path | str:
     raise ArgumentTypeError(f"Argument '{path}' is neither an existing file nor a URL")
 
 
+def _metadata_sources(path: str) -> List[Path | str]:
+    if glob.has_magic(path):
+        matches = sorted(glob.glob(path, recursive=True))
+        if not (files := [Path(match) for match in matches if Path(match).is_file()]):
+            raise ArgumentTypeError(f"Pattern '{path}' does not match any files")
+        return files
+    path_or_url = _path_or_url(path)
+    if isinstance(path_or_url, Path) and path_or_url.is_dir():
+        from rdflib.util import SUFFIX_FORMAT_MAP
+
+        return sorted(
+            file
+            for file in path_or_url.rglob("*")
+            if file.is_file() and file.suffix[1:] in SUFFIX_FORMAT_MAP
+        )
+    return [path_or_url]
+
+
 def _path(path: str) -> Path:
     path_obj = Path(path)
     if path_obj.exists():
@@ -39,12 +66,14 @@ def make_argument_parser() -> ArgumentParser:
         description="Validate publication metadata using Software CaRD policies.",
     )
     parser.add_argument(
-        "metadata_file",
+        "metadata_files",
         help=(
             "file containing Codemeta-based software publication metadata "
-            "(as a file path or URL)"
+            "(as a file path or URL); multiple files, directories and glob patterns "
+            "may be given to validate many files at once"
         ),
-        type=_path_or_url,
+        type=_metadata_sources,
+        nargs="+",
         metavar="METADATA_FILE",
     )
     parser.add_argument(
@@ -55,6 +84,90 @@ def make_argument_parser() -> ArgumentParser:
         default="config.toml",
         metavar="CONFIG_FILE",
     )
+    parser.add_argument(
+        "--cache-dir",
+        help=f"directory for cached data (the default is {default_cache_dir()})",
+        type=Path,
+        default=default_cache_dir(),
+        metavar="CACHE_DIR",
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="do not read or write cached shapes graphs, policies, and results",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        help="remove all cached shapes graphs, policies, and results before validating",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--offline",
+        help="only use cached copies of remote policies",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help=(
+            "number of processes used to validate multiple files (the default is 1) or "
+            "policies (the default is one per policy)"
+        ),
+        type=positive_int,
+        metavar="JOBS",
+    )
+    parser.add_argument(
+        "--split-records",
+        help=(
+            "split the metadata files into their software publications and validate "
+            "each publication separately, e.g. for large dumps"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--per-policy",
+        help="validate each policy separately and concurrently",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--min-severity",
+        help=(
+            "only report results of at least this severity and skip the shapes which "
+            "can only produce less severe results (the default is info)"
+        ),
+        choices=("info", "warning", "violation"),
+        default="info",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        help=(
+            "stop validating a metadata file once it fails, so that only some of its "
+            "results are reported"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        help=(
+            "output format of the reports: human-readable text, JSON Lines or SARIF "
+            "(the default is text)"
+        ),
+        choices=REPORT_FORMATS,
+        default="text",
+    )
+    parser.add_argument(
+        "--profile",
+        help="write the durations of the phases of the validation as JSON to a file",
+        type=Path,
+        metavar="PROFILE_FILE",
+    )
+    parser.add_argument(
+        "--cprofile",
+        help="write cProfile statistics to a file (e.g. for snakeviz or flameprof)",
+        type=Path,
+        metavar="CPROFILE_FILE",
+    )
     parser.add_argument(
         "-d",
         "--debug",
@@ -70,34 +183,235 @@ def make_argument_parser() -> ArgumentParser:
     return parser
 
 
-def main():
-    parser = make_argument_parser()
-    arguments = parser.parse_args()
+def _load_policies(make, config, **kwargs):
+    """Call ``make``, exiting with an error if a policy or ontology can't be loaded."""
+    from software_card_policies.data_model import OntologyLoadError, PolicyLoadError
 
     try:
-        config = make_config(config_file=arguments.config)
+        return make(config, **kwargs)
+    except (PolicyLoadError, OntologyLoadError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+
+
+def _run_validation(validate, *args, **kwargs):
+    """Call ``validate``, exiting with an error if a SHACL-JS library can't be read."""
+    from software_card_policies.javascript import JSLibraryError
+
+    try:
+        return validate(*args, **kwargs)
+    except JSLibraryError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+
+
+def _validate_batch(sources, config, shapes_cache, results_cache, fetcher, arguments):
+    from software_card_policies.batch import validate_records, validate_sources
+    from software_card_policies.data_model import (
+        SeverityLevel,
+        make_schema_closure,
+        make_shacl_graph,
+    )
+    from software_card_policies.report import make_report_writer
+
+    shapes_graph = _load_policies(
+        make_shacl_graph, config, cache=shapes_cache, fetcher=fetcher
+    )
+    schema = _load_policies(
+        make_schema_closure, config, cache=shapes_cache, fetcher=fetcher
+    )
+
+    if arguments.debug:
+        shapes_graph.serialize("debug-shapes-processed.ttl", "turtle")
+
+    writer = make_report_writer(
+        arguments.format, sys.stdout, debug=arguments.debug, headers=True
+    )
+    writer.start()
+    validated = failed = errors = 0
+    jobs = arguments.jobs or 1
+    validate = validate_records if arguments.split_records else validate_sources
+    with span("validate_sources", files=len(sources), jobs=jobs):
+        results = validate(
+            sources,
+            shapes_graph,
+            jobs=jobs,
+            inference=config.inference,
+            schema=schema,
+            cache=results_cache,
+            min_severity=SeverityLevel[arguments.min_severity.upper()],
+            fail_fast=arguments.fail_fast,
+            fetcher=fetcher,
+        )
+        for result in results:
+            validated += 1
+            if result.error is not None:
+                errors += 1
+                writer.write_error(str(result.source), result.error)
+                continue
+            if not result.conforms:
+                failed += 1
+            writer.write_report(
+                str(result.source), result.report.conforms, result.report.results
+            )
+    writer.finish(
+        {
+            "validated": validated,
+            "succeeded": validated - failed - errors,
+            "failed": failed,
+            "could_not_be_validated": errors,
+        }
+    )
+
+    if errors:
+        sys.exit(2)
+    if failed:
+        sys.exit(1)
+
+
+def _validate(parser, arguments):
+    try:
+        with span("make_config"):
+            config = make_config(config_file=arguments.config)
     except Exception as e:
         print(e, file=sys.stderr)
         sys.exit(2)
 
-    data_graph = read_rdf_resource(arguments.metadata_file)
-    shapes_graph = make_shacl_graph(config)
+    with span("import_modules"):
+        from software_card_policies.data_model import (
+            SeverityLevel,
+            make_schema_closure,
+            make_shacl_graph,
+            make_shacl_graphs,
+            read_rdf_resource,
+            validate_graph,
+        )
+        from software_card_policies.fetch import Fetcher
+        from software_card_policies.javascript import JSRuntime
+        from software_card_policies.parallel import PolicyPool
+        from software_card_policies.report import (
+            iter_validation_results,
+            make_report_writer,
+            read_validation_conforms,
+        )
+
+    shapes_cache = FileCache(arguments.cache_dir / "shapes")
+    policies_cache = FileCache(arguments.cache_dir / "policies")
+    results_cache = FileCache(arguments.cache_dir / "results")
+    if arguments.clear_cache:
+        shapes_cache.clear()
+        policies_cache.clear()
+        results_cache.clear()
+    if arguments.no_cache:
+        shapes_cache = policies_cache = results_cache = None
+
+    try:
+        fetcher = Fetcher(cache=policies_cache, offline=arguments.offline)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+
+    sources = list(chain.from_iterable(arguments.metadata_files))
+    if arguments.per_policy and arguments.split_records:
+        parser.error("--per-policy can't be used with --split-records")
+    if len(sources) != 1 or arguments.split_records:
+        if arguments.per_policy:
+            parser.error("--per-policy can only be used with a single metadata file")
+        _validate_batch(
+            sources, config, shapes_cache, results_cache, fetcher, arguments
+        )
+        return
+
+    data_graph = read_rdf_resource(sources[0])
 
     if arguments.debug:
         data_graph.serialize("debug-input-data.ttl", "turtle")
-        shapes_graph.serialize("debug-shapes-processed.ttl", "turtle")
 
-    conforms, validation_graph = validate_graph(data_graph, shapes_graph)
+    schema = _load_policies(
+        make_schema_closure, config, cache=shapes_cache, fetcher=fetcher
+    )
+    min_severity = SeverityLevel[arguments.min_severity.upper()]
+
+    if arguments.per_policy:
+        shapes_graphs = _load_policies(make_shacl_graphs, config, fetcher=fetcher)
+        if arguments.debug:
+            for name, shapes_graph in shapes_graphs.items():
+                shapes_graph.serialize(f"debug-shapes-processed-{name}.ttl", "turtle")
+        with PolicyPool(
+            shapes_graphs,
+            jobs=arguments.jobs,
+            inference=config.inference,
+            schema=schema,
+            min_severity=min_severity,
+            fail_fast=arguments.fail_fast,
+            fetcher=fetcher,
+        ) as pool:
+            conforms, validation_graph = _run_validation(pool.validate, data_graph)
+    else:
+        shapes_graph = _load_policies(
+            make_shacl_graph, config, cache=shapes_cache, fetcher=fetcher
+        )
+        if arguments.debug:
+            shapes_graph.serialize("debug-shapes-processed.ttl", "turtle")
+        conforms, validation_graph = _run_validation(
+            validate_graph,
+            data_graph,
+            shapes_graph,
+            inference=config.inference,
+            schema=schema,
+            js_runtime=JSRuntime(fetcher),
+            cache=results_cache,
+            min_severity=min_severity,
+            fail_fast=arguments.fail_fast,
+        )
 
     if arguments.debug:
         validation_graph.serialize("debug-validation-report.ttl", "turtle")
 
-    report = create_report(validation_graph, debug=arguments.debug)
-    print(report)
+    with span("write_report", format=arguments.format):
+        writer = make_report_writer(arguments.format, sys.stdout, debug=arguments.debug)
+        writer.start()
+        writer.write_report(
+            str(sources[0]),
+            read_validation_conforms(validation_graph),
+            iter_validation_results(validation_graph),
+        )
+        writer.finish()
 
     if not conforms:
         sys.exit(1)
 
 
+def main():
+    parser = make_argument_parser()
+    arguments = parser.parse_args()
+
+    if arguments.debug:
+        # List details such as the shapes skipped during validation.
+        logging.basicConfig(format="%(name)s: %(message)s")
+        logging.getLogger("software_card_policies").setLevel(logging.DEBUG)
+
+    if arguments.profile is None and arguments.cprofile is None:
+        _validate(parser, arguments)
+        return
+
+    tracer = Tracer()
+    profiler = cProfile.Profile() if arguments.cprofile is not None else None
+    try:
+        with tracing(tracer), tracer.span("software-card-validate"):
+            if profiler is not None:
+                profiler.enable()
+            try:
+                _validate(parser, arguments)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+    finally:
+        if arguments.profile is not None:
+            arguments.profile.write_text(json.dumps(tracer.to_dict(), indent=2))
+        if profiler is not None:
+            profiler.dump_stats(arguments.cprofile)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,13 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+"""Argument types shared by ``software-card-validate`` and ``software-card-serve``."""
+
+from argparse import ArgumentTypeError
+
+
+def positive_int(value: str) -> int:
+    if (number := int(value)) < 1:
+        raise ArgumentTypeError(f"Argument '{value}' is not a positive number")
+    return number
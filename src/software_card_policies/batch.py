@@ -0,0 +1,266 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence, Tuple
+
+from rdflib import Graph
+
+from software_card_policies.cache import FileCache
+from software_card_policies.data_model import (
+    SchemaClosure,
+    SeverityLevel,
+    ValidationReport,
+    dump_shacl_graph,
+    load_shacl_graph,
+    mark_shacl_graph_verified,
+    read_rdf_resource,
+    validate_graph,
+)
+from software_card_policies.fetch import Fetcher
+from software_card_policies.javascript import JSRuntime
+from software_card_policies.records import DEFAULT_MAX_DEPTH, split_records
+from software_card_policies.report import read_validation_report
+
+
+@dataclass
+class BatchResult:
+    """Outcome of validating one metadata file in a batch."""
+
+    source: Path | str
+    report: ValidationReport | None
+    error: str | None = None
+    #: Whether the ``error`` occurred while reading the metadata
+    unreadable: bool = False
+
+    @property
+    def conforms(self) -> bool:
+        return self.report is not None and self.report.conforms
+
+
+# The shapes graph, validation settings, result cache, and JavaScript runtime of the
+# current worker process. They are set up once when the worker is started and then used
+# for all files the worker validates.
+_worker_shapes_graph: Graph | None = None
+_worker_inference = "rdfs"
+_worker_schema: SchemaClosure | None = None
+_worker_cache: FileCache | None = None
+_worker_min_severity = SeverityLevel.INFO
+_worker_fail_fast = False
+_worker_js_runtime: JSRuntime | None = None
+
+
+def init_worker(
+    shapes_data: bytes,
+    inference: str = "rdfs",
+    schema_data: bytes | None = None,
+    cache: FileCache | None = None,
+    min_severity: SeverityLevel = SeverityLevel.INFO,
+    fail_fast: bool = False,
+    fetcher: Fetcher | None = None,
+) -> None:
+    """Set up a worker process using a shapes graph serialized by `dump_shacl_graph`.
+
+    The shapes graph must already have been verified in the parent process.
+    ``schema_data`` is a `SchemaClosure` serialized using `SchemaClosure.dump`.
+    Validation graphs are cached in ``cache``. ``min_severity`` and ``fail_fast`` are
+    passed on to `validate_graph`. The scripts of SHACL-JS libraries are read using
+    ``fetcher``.
+    """
+    global _worker_shapes_graph, _worker_inference, _worker_schema, _worker_cache
+    global _worker_min_severity, _worker_fail_fast, _worker_js_runtime
+    _worker_shapes_graph = load_shacl_graph(shapes_data)
+    mark_shacl_graph_verified(_worker_shapes_graph)
+    _worker_inference = inference
+    _worker_schema = SchemaClosure.load(schema_data) if schema_data else None
+    _worker_cache = cache
+    _worker_min_severity, _worker_fail_fast = min_severity, fail_fast
+    _worker_js_runtime = JSRuntime(fetcher) if fetcher is not None else None
+
+
+def _set_up_inline(
+    shapes_graph: Graph | None,
+    inference: str = "rdfs",
+    schema: SchemaClosure | None = None,
+    cache: FileCache | None = None,
+    min_severity: SeverityLevel = SeverityLevel.INFO,
+    fail_fast: bool = False,
+    fetcher: Fetcher | None = None,
+) -> None:
+    """Like `init_worker`, but for validating in the current process."""
+    global _worker_shapes_graph, _worker_inference, _worker_schema, _worker_cache
+    global _worker_min_severity, _worker_fail_fast, _worker_js_runtime
+    _worker_shapes_graph = shapes_graph
+    _worker_inference, _worker_schema, _worker_cache = inference, schema, cache
+    _worker_min_severity, _worker_fail_fast = min_severity, fail_fast
+    _worker_js_runtime = JSRuntime(fetcher) if fetcher is not None else None
+
+
+def _error(source: Path | str, e: Exception, unreadable: bool = False) -> BatchResult:
+    return BatchResult(source, None, f"{type(e).__name__}: {e}", unreadable)
+
+
+def _validate(source: Path | str, data_graph_factory) -> BatchResult:
+    try:
+        data_graph = data_graph_factory()
+    except Exception as e:
+        return _error(source, e, unreadable=True)
+    try:
+        _conforms, validation_graph = validate_graph(
+            data_graph,
+            _worker_shapes_graph,
+            inference=_worker_inference,
+            schema=_worker_schema,
+            js_runtime=_worker_js_runtime,
+            cache=_worker_cache,
+            min_severity=_worker_min_severity,
+            fail_fast=_worker_fail_fast,
+        )
+        return BatchResult(source, read_validation_report(validation_graph))
+    except Exception as e:
+        return _error(source, e)
+
+
+def validate_source(source: Path | str) -> BatchResult:
+    """Validate a metadata file in a worker process."""
+    return _validate(source, lambda: read_rdf_resource(source))
+
+
+def validate_data(data: bytes, format: str, source: str = "<data>") -> BatchResult:
+    """Validate serialized metadata in a worker process."""
+    return _validate(source, lambda: read_rdf_resource(format=format, data=data))
+
+
+def _validate_record(record: Tuple[str, bytes]) -> BatchResult:
+    name, data = record
+    return validate_data(data, "nt", source=name)
+
+
+def validate_sources(
+    sources: Sequence[Path | str],
+    shapes_graph: Graph,
+    jobs: int = 1,
+    inference: str = "rdfs",
+    schema: SchemaClosure | None = None,
+    cache: FileCache | None = None,
+    min_severity: SeverityLevel = SeverityLevel.INFO,
+    fail_fast: bool = False,
+    fetcher: Fetcher | None = None,
+) -> Iterator[BatchResult]:
+    """Validate many metadata files against one shapes graph.
+
+    The files are distributed across ``jobs`` worker processes. Results are yielded in
+    the order of ``sources`` as soon as they are available. ``inference``, ``schema``,
+    ``cache``, ``min_severity``, and ``fail_fast`` are passed on to `validate_graph`.
+    The scripts of SHACL-JS libraries are read using ``fetcher``.
+    """
+    if jobs == 1:
+        _set_up_inline(
+            shapes_graph, inference, schema, cache, min_severity, fail_fast, fetcher
+        )
+        try:
+            yield from map(validate_source, sources)
+        finally:
+            _set_up_inline(None)
+        return
+
+    shapes_data = dump_shacl_graph(shapes_graph)
+    schema_data = schema.dump() if schema is not None else None
+    chunksize = max(1, min(64, len(sources) // (jobs * 4)))
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=init_worker,
+        initargs=(
+            shapes_data,
+            inference,
+            schema_data,
+            cache,
+            min_severity,
+            fail_fast,
+            fetcher,
+        ),
+    ) as executor:
+        yield from executor.map(validate_source, sources, chunksize=chunksize)
+
+
+def _split_sources(
+    sources: Iterable[Path | str], max_depth: int
+) -> Iterator[Tuple[str, bytes] | BatchResult]:
+    """Yield the records of all sources, or a `BatchResult` for unreadable sources."""
+    for source in sources:
+        try:
+            yield from split_records(source, max_depth=max_depth)
+        except Exception as e:
+            yield _error(source, e, unreadable=True)
+
+
+def validate_records(
+    sources: Iterable[Path | str],
+    shapes_graph: Graph,
+    jobs: int = 1,
+    inference: str = "rdfs",
+    schema: SchemaClosure | None = None,
+    cache: FileCache | None = None,
+    min_severity: SeverityLevel = SeverityLevel.INFO,
+    fail_fast: bool = False,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    fetcher: Fetcher | None = None,
+) -> Iterator[BatchResult]:
+    """Split metadata dumps into their records and validate each record separately.
+
+    See `software_card_policies.records` for how the dumps are split. The result of a
+    record has the name of the record as its source (see `RecordIndex.records`). Only
+    a bounded number of records is held in memory at a time, and results are yielded in
+    the order of the records as soon as they are available. The other arguments are as
+    for `validate_sources`.
+    """
+    records = _split_sources(sources, max_depth)
+    if jobs == 1:
+        _set_up_inline(
+            shapes_graph, inference, schema, cache, min_severity, fail_fast, fetcher
+        )
+        try:
+            for record in records:
+                if isinstance(record, BatchResult):
+                    yield record
+                else:
+                    yield _validate_record(record)
+        finally:
+            _set_up_inline(None)
+        return
+
+    shapes_data = dump_shacl_graph(shapes_graph)
+    schema_data = schema.dump() if schema is not None else None
+    # Unlike `executor.map`, submit records only while few results are pending, so
+    # that the records of a large dump are not all read into memory at once.
+    pending = deque()
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=init_worker,
+        initargs=(
+            shapes_data,
+            inference,
+            schema_data,
+            cache,
+            min_severity,
+            fail_fast,
+            fetcher,
+        ),
+    ) as executor:
+        for record in records:
+            if isinstance(record, BatchResult):
+                pending.append(record)
+            else:
+                pending.append(executor.submit(_validate_record, record))
+            while len(pending) > jobs * 4 or (
+                pending and isinstance(pending[0], BatchResult)
+            ):
+                result = pending.popleft()
+                yield result if isinstance(result, BatchResult) else result.result()
+        while pending:
+            result = pending.popleft()
+            yield result if isinstance(result, BatchResult) else result.result()
@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+"""Default upper bound for the size of a cache directory in bytes."""
+
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+"""Default time in seconds after which unused cache entries are evicted."""
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory of this package."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "software-card-policies"
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Derive a stable key from JSON-serializable values and bytes."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, default=str).encode("utf-8")
+        # Prefix each part with its length so that adjacent parts can't run together.
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class FileCache:
+    """A directory of files addressed by key.
+
+    Entries that have not been used for ``max_age`` seconds are evicted. If the total
+    size of all entries exceeds ``max_size`` bytes, the least recently used entries are
+    evicted. Either limit can be disabled by passing ``None``.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_size: int | None = DEFAULT_MAX_SIZE,
+        max_age: float | None = DEFAULT_MAX_AGE,
+    ):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.max_age = max_age
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key
+
+    def get(self, key: str) -> bytes | None:
+        """Return the data stored under ``key`` or ``None`` on a cache miss."""
+        path = self._path(key)
+        try:
+            if self.max_age is not None:
+                if time.time() - path.stat().st_mtime > self.max_age:
+                    path.unlink(missing_ok=True)
+                    return None
+            data = path.read_bytes()
+            # Mark the entry as recently used.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store ``data`` under ``key`` and evict old entries if necessary."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that concurrent readers never see a
+        # partially written entry.
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_name, self._path(key))
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def entries(self) -> Dict[Path, os.stat_result]:
+        """Return all cache entries along with their file status."""
+        if not self.directory.is_dir():
+            return {}
+        result = {}
+        for path in self.directory.iterdir():
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                result[path] = path.stat()
+            except FileNotFoundError:
+                pass
+        return result
+
+    def evict(self) -> None:
+        """Remove entries that are too old or exceed the size limit."""
+        entries = self.entries()
+        now = time.time()
+        if self.max_age is not None:
+            for path, stat in list(entries.items()):
+                if now - stat.st_mtime > self.max_age:
+                    path.unlink(missing_ok=True)
+                    del entries[path]
+        if self.max_size is not None:
+            total_size = sum(stat.st_size for stat in entries.values())
+            by_last_use = sorted(entries.items(), key=lambda item: item[1].st_mtime)
+            for path, stat in by_last_use:
+                if total_size <= self.max_size:
+                    break
+                path.unlink(missing_ok=True)
+                total_size -= stat.st_size
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        for path in self.entries():
+            path.unlink(missing_ok=True)
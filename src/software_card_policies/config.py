@@ -4,10 +4,14 @@
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import toml
 
+#: How the data graph is expanded before validation: not at all, by pyshacl's RDFS
+#: inference, or using a precomputed RDFS closure of the configured ontologies
+INFERENCE_MODES = ("none", "rdfs", "precomputed")
+
 
 @dataclass
 class Policy:
@@ -27,6 +31,12 @@ class Policy:
 @dataclass
 class Config:
     policies: Dict[str, Policy]
+    inference: str = "rdfs"
+    #: Sources of ontologies (e.g. schema.org) used for inference
+    ontologies: List[str] = field(default_factory=list)
+    #: Directory of the config file, against which relative paths of files holding
+    #: parameter values are resolved
+    directory: Path | None = None
 
     @classmethod
     def from_dict(cls, settings: dict):
@@ -34,11 +44,27 @@ class Config:
         assert "policies" in settings
         policies: dict = settings["policies"]
         assert all(isinstance(key, str) for key in policies.keys())
+        inference = settings.get("inference", "rdfs")
+        ontologies = settings.get("ontologies", [])
+        if inference not in INFERENCE_MODES:
+            raise ValueError(
+                f"Unknown inference mode '{inference}', "
+                f"use one of {', '.join(INFERENCE_MODES)}"
+            )
+        assert isinstance(ontologies, list)
+        assert all(isinstance(source, str) for source in ontologies)
+        if inference == "precomputed" and not ontologies:
+            raise ValueError(
+                "Inference mode 'precomputed' requires at least one entry in "
+                "'ontologies'"
+            )
         return cls(
             policies={
                 policy_name: Policy.from_dict(policy_settings)
                 for policy_name, policy_settings in policies.items()
-            }
+            },
+            inference=inference,
+            ontologies=ontologies,
         )
 
 
@@ -56,4 +82,7 @@ def make_config(*, config_file: Path = None, config_dict: dict = None) -> Config
             config_dict = toml.load(config_file)
         except toml.TomlDecodeError:
             raise ValueError(f"Config file '{config_file}' could not be parsed")
+        config = Config.from_dict(config_dict)
+        config.directory = config_file.parent
+        return config
     return Config.from_dict(config_dict)
@@ -2,23 +2,52 @@
 # SPDX-License-Identifier: Apache-2.0
 # SPDX-FileContributor: David Pape
 
-import operator
-from dataclasses import dataclass
+import hashlib
+import logging
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import asdict, dataclass
+from decimal import Decimal
 from enum import Enum
-from functools import reduce
+from functools import lru_cache
 from pathlib import Path
 from types import NoneType
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Tuple
+from urllib.parse import quote, unquote
 
-from pyshacl import validate
-from rdflib import BNode, Graph, Literal, Node
+from rdflib import BNode, Dataset, Graph, Literal, Node
 from rdflib.collection import Collection
-from rdflib.namespace import RDF, RDFS, SH, XSD
+from rdflib.namespace import OWL, RDF, RDFS, SH, XSD
 from rdflib.term import URIRef
+from rdflib.util import guess_format
 
+from software_card_policies import __version__
+from software_card_policies.cache import FileCache, make_cache_key
 from software_card_policies.config import Config
-from software_card_policies.namespaces import PREFIXES, SC
-from software_card_policies.rdf_helpers import get_language_tagged_literal
+from software_card_policies.enumerations import (
+    add_set,
+    enumeration_files,
+    in_set_component,
+    register_sets,
+    resolve_enumerations,
+)
+from software_card_policies.fetch import Fetcher, is_url, resource_base
+from software_card_policies.javascript import JSRuntime, default_runtime
+from software_card_policies.namespaces import PREFIXES, SC, SCIMPL
+from software_card_policies.rdf_helpers import (
+    format_node,
+    format_shacl_path,
+    get_language_tagged_literal,
+    graph_hash,
+    remove_closure,
+    select_language,
+)
+from software_card_policies.tracing import span
+from software_card_policies.vocabulary import get_comment, get_label
+
+logger = logging.getLogger(__name__)
 
 #################################### Software CaRD ####################################
 
@@ -45,7 +74,7 @@ class Parameter:
 
 
 # TODO: This only works for constraints of type NodeShape. Is this enough?
-@dataclass
+@dataclass(slots=True)
 class Policy:
     """Model of a Software CaRD Policy."""
 
@@ -74,6 +103,15 @@ class SeverityLevel(Enum):
     def __str__(self):
         return self.name.title()
 
+    @property
+    def rank(self) -> int:
+        """The rank by which severities are compared, e.g. for ``min_severity``.
+
+        Custom severities rank like ``sh:Violation``, as SHACL doesn't order them and
+        their results don't conform either.
+        """
+        return min(self.value, SeverityLevel.VIOLATION.value)
+
     @classmethod
     def from_graph(cls, reference: URIRef, graph: Graph):
         if reference == SH.Info:
@@ -85,7 +123,7 @@ class SeverityLevel(Enum):
         return cls.OTHER
 
 
-@dataclass
+@dataclass(slots=True)
 class Severity:
     """Model of `sh:Severity`."""
 
@@ -98,33 +136,137 @@ class Severity:
 
     @classmethod
     def from_graph(cls, reference: URIRef, graph: Graph):
+        # Labels and comments of the SHACL severities are bundled with the package.
+        # Custom severities may come with their own.
         return cls(
-            label=get_language_tagged_literal(graph, reference, RDFS.label),
-            comment=get_language_tagged_literal(graph, reference, RDFS.comment),
+            label=(
+                get_label(reference)
+                or get_language_tagged_literal(graph, reference, RDFS.label)
+            ),
+            comment=(
+                get_comment(reference)
+                or get_language_tagged_literal(graph, reference, RDFS.comment)
+            ),
             level=SeverityLevel.from_graph(reference, graph),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationResult:
     """Model of a `sh:ValidationResult`."""
 
     severity: Severity
     message: str
     source_policy: Policy
+    #: Name of the policy in the config, if known
+    policy_config_name: str | None = None
+    #: The node that breached the policy (`sh:focusNode`)
+    focus_node: str | None = None
+    #: The property path of the breach (`sh:resultPath`), if any
+    result_path: str | None = None
 
     @classmethod
     def from_graph(cls, reference: URIRef, graph: Graph):
         severity = graph.value(reference, SH.resultSeverity, None)
         source_policy = graph.value(reference, SH.sourceShape, None)
+        policy_config_name = graph.value(reference, SCIMPL.policyConfigName, None)
         return cls(
             severity=Severity.from_graph(severity, graph),
             message=get_language_tagged_literal(graph, reference, SH.resultMessage),
             source_policy=Policy.from_graph(source_policy, graph),
+            policy_config_name=(
+                str(policy_config_name) if policy_config_name is not None else None
+            ),
+            focus_node=format_node(graph.value(reference, SH.focusNode, None)),
+            result_path=format_shacl_path(
+                graph, graph.value(reference, SH.resultPath, None)
+            ),
         )
 
 
-@dataclass
+class _ReportIndex:
+    """Index of the triples of a validation graph needed to build a report.
+
+    The graph is scanned once. Policies and severities are created once per shape and
+    severity node and are shared between all results referring to them.
+    """
+
+    _PREDICATES = frozenset(
+        (
+            SH.result,
+            SH.resultSeverity,
+            SH.sourceShape,
+            SH.resultMessage,
+            SH.focusNode,
+            SH.resultPath,
+            SH.name,
+            SH.description,
+            RDFS.label,
+            RDFS.comment,
+            SCIMPL.policyConfigName,
+        )
+    )
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        self._objects: Dict[Tuple[Node, URIRef], List[Node]] = {}
+        for subject, predicate, obj in graph:
+            if predicate in self._PREDICATES:
+                self._objects.setdefault((subject, predicate), []).append(obj)
+        self._policies: Dict[Node, Policy] = {}
+        self._severities: Dict[Node, Severity] = {}
+
+    def value(self, subject: Node, predicate: URIRef) -> Node | None:
+        objects = self._objects.get((subject, predicate))
+        return objects[0] if objects else None
+
+    def literal(self, subject: Node, predicate: URIRef) -> Any:
+        objects = self._objects.get((subject, predicate), ())
+        literals_by_language = {}
+        for obj in objects:
+            assert isinstance(obj, Literal)
+            literals_by_language[obj.language] = obj.value
+        return select_language(literals_by_language)
+
+    def policy(self, reference: Node) -> Policy:
+        if (policy := self._policies.get(reference)) is None:
+            policy = self._policies[reference] = Policy(
+                name=self.literal(reference, SH.name),
+                description=self.literal(reference, SH.description),
+            )
+        return policy
+
+    def severity(self, reference: Node) -> Severity:
+        if (severity := self._severities.get(reference)) is None:
+            severity = self._severities[reference] = Severity(
+                label=get_label(reference) or self.literal(reference, RDFS.label),
+                comment=(
+                    get_comment(reference) or self.literal(reference, RDFS.comment)
+                ),
+                level=SeverityLevel.from_graph(reference, self.graph),
+            )
+        return severity
+
+    def result(self, reference: Node) -> ValidationResult:
+        policy_config_name = self.value(reference, SCIMPL.policyConfigName)
+        result_path = self.value(reference, SH.resultPath)
+        return ValidationResult(
+            severity=self.severity(self.value(reference, SH.resultSeverity)),
+            message=self.literal(reference, SH.resultMessage),
+            source_policy=self.policy(self.value(reference, SH.sourceShape)),
+            policy_config_name=(
+                str(policy_config_name) if policy_config_name is not None else None
+            ),
+            focus_node=format_node(self.value(reference, SH.focusNode)),
+            result_path=format_shacl_path(self.graph, result_path),
+        )
+
+    def results(self, report: Node) -> Iterator[ValidationResult]:
+        for result in self._objects.get((report, SH.result), ()):
+            yield self.result(result)
+
+
+@dataclass(slots=True)
 class ValidationReport:
     """Model of a `sh:ValidationReport`."""
 
@@ -133,12 +275,18 @@ class ValidationReport:
 
     @classmethod
     def from_graph(cls, reference: URIRef, graph: Graph):
-        results = graph.objects(reference, SH.result)
         return cls(
             conforms=(reference, SH.conforms, Literal(True)) in graph,
-            results=[ValidationResult.from_graph(result, graph) for result in results],
+            results=list(cls.iter_results_from_graph(reference, graph)),
         )
 
+    @staticmethod
+    def iter_results_from_graph(
+        reference: URIRef, graph: Graph
+    ) -> Iterator[ValidationResult]:
+        """Extract the results of a report one by one after indexing the graph once."""
+        return _ReportIndex(graph).results(reference)
+
 
 ################################## Graph Interaction ##################################
 
@@ -146,6 +294,7 @@ class ValidationReport:
 
 _ALLOWED_OUTER_TYPES = (
     SC.Scalar,
+    SCIMPL.Set,
     RDF.List,
 )
 
@@ -166,10 +315,12 @@ def read_rdf_resource(
     source: Path | None = None,
     format: str | None = None,
     data: str | bytes | None = None,
+    public_id: str | None = None,
 ) -> Graph:
     """Read in an RDF resource.
 
-    Either ``source``, or ``format`` and ``data`` must be given.
+    Either ``source``, or ``format`` and ``data`` must be given. ``public_id`` is used
+    as the base IRI when reading ``data``.
     """
     assert (
         source is not None
@@ -179,22 +330,25 @@ def read_rdf_resource(
         and format is not None
         and data is not None
     )
-    graph = Graph()
-    graph.parse(source=source, format=format, data=data)
-    for prefix, iri in PREFIXES.items():
-        graph.bind(prefix, iri, replace=True)
+    with span("read_rdf_resource", source=str(source) if source else None) as trace:
+        graph = Graph()
+        graph.parse(source=source, format=format, data=data, publicID=public_id)
+        for prefix, iri in PREFIXES.items():
+            graph.bind(prefix, iri, replace=True)
+        trace.set(triples=len(graph))
     return graph
 
 
 def _create_list_parameter(
-    parameter: Parameter, graph: Graph, config_parameter: Any
+    parameter: Parameter,
+    graph: Graph,
+    config_parameter: Any,
+    default_items: List[Node],
 ) -> Node:
     assert parameter.outer_type == RDF.List
-    assert (parameter.default_value, RDF.first, None) in graph
-    assert (parameter.default_value, RDF.rest, None) in graph
 
     if config_parameter is None:
-        return Collection(graph, parameter.default_value).uri
+        return Collection(graph, BNode(), seq=default_items).uri
 
     # TODO: What happens if `parameter_value` is empty list?
     assert isinstance(config_parameter, list)
@@ -203,8 +357,72 @@ def _create_list_parameter(
     ).uri
 
 
+def _parse_boolean(value: str) -> bool:
+    try:
+        return {"true": True, "1": True, "false": False, "0": False}[value]
+    except KeyError:
+        raise ValueError(value)
+
+
+# Converters of the values in files, which are strings, by inner type.
+_FROM_STRING = {
+    XSD.boolean: _parse_boolean,
+    XSD.integer: int,
+    XSD.int: int,
+    XSD.decimal: Decimal,
+    XSD.float: float,
+    XSD.double: float,
+}
+
+
+def _set_member(parameter: Parameter, value: Any) -> Node:
+    """Convert a configured member of a set to a node of the parameter's inner type."""
+    inner_type = parameter.inner_type
+    if inner_type == RDFS.Resource:
+        if isinstance(value, str):
+            return URIRef(value)
+    elif inner_type in (XSD.string, XSD.anyURI):
+        # Like the values of lists, strings and URIs are plain literals.
+        if isinstance(value, str):
+            return Literal(value)
+    elif isinstance(value, str):
+        try:
+            return Literal(_FROM_STRING[inner_type](value), datatype=inner_type)
+        except ValueError:
+            pass
+    elif inner_type == XSD.boolean:
+        if isinstance(value, bool):
+            return Literal(value, datatype=inner_type)
+    elif isinstance(value, int | float) and not isinstance(value, bool):
+        if inner_type not in (XSD.integer, XSD.int) or isinstance(value, int):
+            return Literal(value, datatype=inner_type)
+    raise ValueError(
+        f"Parameter '{parameter.uri}' has value {value!r}, which is not of its inner "
+        f"type '{parameter.inner_type}'"
+    )
+
+
+def _create_set_parameter(
+    parameter: Parameter,
+    graph: Graph,
+    config_parameter: Any,
+    default_items: List[Node],
+) -> Node:
+    assert parameter.outer_type == SCIMPL.Set
+
+    if config_parameter is None:
+        return add_set(graph, default_items)
+
+    if not isinstance(config_parameter, list):
+        raise ValueError(
+            f"Parameter '{parameter.uri}' must be a list of values or a file "
+            'reference ({file = "..."})'
+        )
+    return add_set(graph, (_set_member(parameter, value) for value in config_parameter))
+
+
 def _create_scalar_parameter(
-    parameter: Parameter, graph: Graph, config_parameter: Any
+    parameter: Parameter, config_parameter: Any, default_value: Node
 ) -> Node:
     assert parameter.outer_type == SC.Scalar
     assert isinstance(config_parameter, (str, int, float, NoneType))
@@ -212,83 +430,1166 @@ def _create_scalar_parameter(
     if config_parameter:
         return Literal(config_parameter)
 
-    return graph.value(parameter.uri, SC.parameterDefaultValue, None)
+    return default_value
+
+
+class PolicyTemplate:
+    """A policy graph that has been prepared for parameterization.
+
+    The policy is scanned once for its ``sc:Parameter`` objects, the places where they
+    are used, and their default values. Instantiating the template for a set of config
+    parameters then only substitutes the values and doesn't have to search the graph
+    again. Templates are not modified by instantiation and can be shared.
+    """
+
+    def __init__(self, graph: Graph):
+        self.parameters: List[Parameter] = []
+        self._occurrences: Dict[URIRef, List[Tuple[Node, Node]]] = {}
+        self._default_values: Dict[URIRef, Node | List[Node]] = {}
+        self._namespaces = list(graph.namespaces())
+
+        excluded_subjects = set()
+        for parameter_ref in graph.subjects(RDF.type, SC.Parameter):
+            parameter = Parameter.from_graph(parameter_ref, graph)
+
+            if parameter.outer_type not in _ALLOWED_OUTER_TYPES:
+                raise ValueError(
+                    f"'Parameter {parameter.uri}' has unknown outer type "
+                    f"'{parameter.outer_type}'"
+                )
+
+            if parameter.inner_type not in _ALLOWED_INNER_TYPES:
+                raise ValueError(
+                    f"Parameter '{parameter.uri}' has unknown inner type "
+                    f"'{parameter.inner_type}'"
+                )
+
+            if parameter.outer_type == SC.Scalar:
+                self._default_values[parameter.uri] = parameter.default_value
+            else:
+                assert (parameter.default_value, RDF.first, None) in graph
+                assert (parameter.default_value, RDF.rest, None) in graph
+                self._default_values[parameter.uri] = list(
+                    Collection(graph, parameter.default_value)
+                )
+                # The cells of the default list are replaced on instantiation.
+                node = parameter.default_value
+                while node != RDF.nil:
+                    excluded_subjects.add(node)
+                    node = graph.value(node, RDF.rest, None)
+
+            self.parameters.append(parameter)
+            self._occurrences[parameter.uri] = list(
+                graph.subject_predicates(parameter.uri)
+            )
+            excluded_subjects.add(parameter.uri)
+
+        # All triples that don't refer to a parameter are used as-is.
+        parameter_uris = set(self._occurrences)
+        self._triples = [
+            (s, p, o)
+            for s, p, o in graph
+            if s not in excluded_subjects and o not in parameter_uris
+        ]
+        if any(parameter.outer_type == SCIMPL.Set for parameter in self.parameters):
+            # The values of sets are checked by a constraint component of our own.
+            self._triples.extend(in_set_component())
+
+    def instantiate(self, config_parameters: Dict[str, Any]) -> Graph:
+        """Create a graph in which all parameters are replaced by their values."""
+        graph = Graph()
+        for prefix, iri in self._namespaces:
+            graph.bind(prefix, iri, replace=True)
+        graph.addN((s, p, o, graph) for s, p, o in self._triples)
+
+        for parameter in self.parameters:
+            config_parameter = config_parameters.get(parameter.config_path)
+            default_value = self._default_values[parameter.uri]
+            if parameter.outer_type == SC.Scalar:
+                o = _create_scalar_parameter(parameter, config_parameter, default_value)
+            elif parameter.outer_type == SCIMPL.Set:
+                o = _create_set_parameter(
+                    parameter, graph, config_parameter, default_value
+                )
+            else:
+                o = _create_list_parameter(
+                    parameter, graph, config_parameter, default_value
+                )
+            graph.addN((s, p, o, graph) for s, p in self._occurrences[parameter.uri])
+
+        return graph
+
+
+def _read_document(source: str, data: bytes, graph: Graph | None = None) -> Graph:
+    """Parse a fetched policy or imported document into ``graph`` (or a new one)."""
+    graph = graph if graph is not None else Graph()
+    graph.parse(
+        data=data,
+        format=guess_format(source) or "turtle",
+        publicID=resource_base(source),
+    )
+    return graph
+
+
+@lru_cache(maxsize=128)
+def _compile_policy(documents: Tuple[Tuple[str, bytes], ...]) -> PolicyTemplate:
+    """Compile a policy from its documents as returned by `_resolve_imports`."""
+    graph = Graph()
+    for source, data in documents:
+        _read_document(source, data, graph)
+    for prefix, iri in PREFIXES.items():
+        graph.bind(prefix, iri, replace=True)
+    return PolicyTemplate(graph)
 
 
 def parameterize_graph(graph: Graph, config_parameters: Dict[str, Any]) -> Graph:
-    """Parameterize the ``graph`` using the ``config_parameters``."""
+    """Parameterize the ``graph`` using the ``config_parameters``.
 
-    # Extract references into a list so we don't have to iterate over the graph we want
-    # to modify!
-    parameter_refs = list(graph.subjects(RDF.type, SC.Parameter))
+    The ``graph`` is modified in place. To parameterize the same policy repeatedly, use
+    a `PolicyTemplate` instead.
+    """
+    parameterized_graph = PolicyTemplate(graph).instantiate(config_parameters)
+    graph.remove((None, None, None))
+    graph.addN((s, p, o, graph) for s, p, o in parameterized_graph)
+    return graph
 
-    for parameter_ref in parameter_refs:
-        parameter = Parameter.from_graph(parameter_ref, graph)
 
-        config_parameter = config_parameters.get(parameter.config_path)
+class SchemaClosure:
+    """The RDFS closure of the schema-level triples of one or more ontologies.
 
-        if parameter.outer_type not in _ALLOWED_OUTER_TYPES:
-            raise ValueError(
-                f"'Parameter {parameter.uri}' has unknown outer type "
-                f"'{parameter.outer_type}'"
-            )
+    The class and property hierarchies and the domains and ranges of properties are
+    closed once, so that a data graph can be expanded by looking up the entailments of
+    each of its triples (see `expand`) instead of computing the full RDFS closure.
+    """
+
+    def __init__(self, graph: Graph):
+        """Wrap a ``graph`` which is already closed (see `compute`)."""
+        self.graph = graph
+        self._superclasses: Dict[Node, List[Node]] = {}
+        self._superproperties: Dict[Node, List[Node]] = {}
+        self._domains: Dict[Node, List[Node]] = {}
+        self._ranges: Dict[Node, List[Node]] = {}
+        lookups = {
+            RDFS.subClassOf: self._superclasses,
+            RDFS.subPropertyOf: self._superproperties,
+            RDFS.domain: self._domains,
+            RDFS.range: self._ranges,
+        }
+        for subject, predicate, obj in graph:
+            if (lookup := lookups.get(predicate)) is not None and subject != obj:
+                lookup.setdefault(subject, []).append(obj)
 
-        if parameter.inner_type not in _ALLOWED_INNER_TYPES:
-            raise ValueError(
-                f"Parameter '{parameter.uri}' has unknown inner type "
-                f"'{parameter.inner_type}'"
+    @classmethod
+    def compute(cls, ontology: Graph):
+        """Compute the closure of the schema-level triples of ``ontology``."""
+
+        def close(pairs: Dict[Node, set]) -> Dict[Node, set]:
+            closed = {}
+            for node in pairs:
+                reached, queue = set(), list(pairs[node])
+                while queue:
+                    if (other := queue.pop()) not in reached:
+                        reached.add(other)
+                        queue.extend(pairs.get(other, ()))
+                closed[node] = reached
+            return closed
+
+        declared = {
+            predicate: {}
+            for predicate in (
+                RDFS.subClassOf,
+                RDFS.subPropertyOf,
+                RDFS.domain,
+                RDFS.range,
             )
+        }
+        for predicate, pairs in declared.items():
+            for subject, obj in ontology.subject_objects(predicate):
+                pairs.setdefault(subject, set()).add(obj)
+        superclasses = close(declared[RDFS.subClassOf])
+        superproperties = close(declared[RDFS.subPropertyOf])
+
+        graph = Graph()
+        for predicate, closed in (
+            (RDFS.subClassOf, superclasses),
+            (RDFS.subPropertyOf, superproperties),
+        ):
+            for subject, objects in closed.items():
+                graph.addN((subject, predicate, obj, graph) for obj in objects)
+        # A property's domains and ranges apply to all of its subproperties (rdfs7),
+        # and they imply all of their superclasses (rdfs9).
+        for predicate in (RDFS.domain, RDFS.range):
+            properties = set(declared[predicate]) | set(superproperties)
+            for subject in properties:
+                classes = set()
+                for prop in {subject} | superproperties.get(subject, set()):
+                    for class_ in declared[predicate].get(prop, ()):
+                        classes |= {class_} | superclasses.get(class_, set())
+                graph.addN((subject, predicate, class_, graph) for class_ in classes)
+        _own_graph(graph)
+        return cls(graph)
+
+    def expand(self, data_graph: Graph) -> Graph:
+        """Return a copy of ``data_graph`` with its instance-level RDFS entailments."""
+        expanded = Graph()
+        for prefix, iri in data_graph.namespaces():
+            expanded.bind(prefix, iri)
+        add = expanded.add
+        for subject, predicate, obj in data_graph:
+            add((subject, predicate, obj))
+            for superproperty in self._superproperties.get(predicate, ()):
+                add((subject, superproperty, obj))
+            for class_ in self._domains.get(predicate, ()):
+                add((subject, RDF.type, class_))
+            if not isinstance(obj, Literal):
+                for class_ in self._ranges.get(predicate, ()):
+                    add((obj, RDF.type, class_))
+            if predicate == RDF.type:
+                for superclass in self._superclasses.get(obj, ()):
+                    add((subject, RDF.type, superclass))
+        return expanded
+
+    def dump(self) -> bytes:
+        return self.graph.serialize(format="nt", encoding="utf-8")
 
-        if parameter.outer_type == SC.Scalar:
-            o = _create_scalar_parameter(parameter, graph, config_parameter)
+    @classmethod
+    def load(cls, data: bytes):
+        graph = read_rdf_resource(format="nt", data=data)
+        _own_graph(graph)
+        return cls(graph)
 
-        else:
-            o = _create_list_parameter(parameter, graph, config_parameter)
 
-        # Add replacements for all occurences of the parameter. Again, extract
-        # occurences before modifying the graph!
-        occurences = list(graph.subject_predicates(parameter.uri))
-        for s, p in occurences:
-            graph.add((s, p, o))
+@dataclass
+class _GraphMemo:
+    """What has been derived from a shapes graph or schema created by this package."""
+
+    #: Number of triples of the graph when the memo was started
+    size: int
+    #: Whether the graph is known to conform to the SHACL-SHACL shapes
+    verified: bool = False
+    #: Targets of the shapes of the graph
+    target_index: "_ShapeTargetIndex | None" = None
+    #: Hash of the contents of the graph (see `graph_hash`)
+    hash: str | None = None
+
+
+# Memos of the graphs created by this package (see `_own_graph`), which are used for
+# many validations. Other graphs may be changed in place by their owners at any time,
+# so nothing is memoized for them.
+_graph_memos: "weakref.WeakKeyDictionary[Graph, _GraphMemo]" = (
+    weakref.WeakKeyDictionary()
+)
+# Shapes graphs may be shared between threads (see `validator.Validator`).
+_graph_memos_lock = threading.Lock()
 
-        # remove all references to the parameter from the graph
-        graph.remove((parameter.uri, None, None))
-        graph.remove((None, None, parameter.uri))
-        if parameter.outer_type != SC.Scalar:
-            Collection(graph, parameter.default_value).clear()
 
-    return graph
+def _own_graph(graph: Graph) -> None:
+    """Record that ``graph`` was created by this package, so that it is memoized."""
+    with _graph_memos_lock:
+        if graph not in _graph_memos:
+            _graph_memos[graph] = _GraphMemo(len(graph))
+
+
+def _graph_memo(graph: Graph) -> _GraphMemo | None:
+    """Return the memo of ``graph``, or ``None`` if it isn't memoized.
+
+    Must be called while holding ``_graph_memos_lock``.
+    """
+    memo = _graph_memos.get(graph)
+    if memo is not None and memo.size != len(graph):
+        # The graph was changed after it had been returned by this package.
+        memo = _graph_memos[graph] = _GraphMemo(len(graph))
+    return memo
+
+
+def mark_shacl_graph_verified(shacl_graph: Graph) -> None:
+    """Record that ``shacl_graph`` is known to be valid.
+
+    Use this for graphs that are copies of a graph which has already been verified, and
+    which are not changed afterwards. If triples are added to or removed from the graph,
+    it is verified again.
+    """
+    with _graph_memos_lock:
+        _graph_memos[shacl_graph] = _GraphMemo(len(shacl_graph), verified=True)
+
+
+def clear_caches() -> None:
+    """Forget the compiled policies and everything memoized for graphs.
+
+    Graphs created by this package are still memoized afterwards, but start over as if
+    they had just been created. This is useful to measure validations from a cold start.
+    """
+    _compile_policy.cache_clear()
+    with _graph_memos_lock:
+        for graph in list(_graph_memos):
+            _graph_memos[graph] = _GraphMemo(len(graph))
+
+
+def verify_shacl_graph(shacl_graph: Graph) -> None:
+    """Validate ``shacl_graph`` against the SHACL-SHACL shapes ("meta-SHACL").
+
+    The check is only run once for graphs created by `make_shacl_graph` or marked using
+    `mark_shacl_graph_verified`, as long as they aren't changed. Other graphs are
+    checked on every call. Raises a ``ValueError`` if the graph is not a valid shapes
+    graph.
+    """
+    with _graph_memos_lock:
+        memo = _graph_memo(shacl_graph)
+        if memo is not None and memo.verified:
+            return
+    # pyshacl (and its JavaScript engine) takes long to import, so it is only imported
+    # once a graph is actually validated.
+    from pyshacl.entrypoints import meta_validate
+
+    with span("verify_shacl_graph", triples=len(shacl_graph)):
+        conforms, _validation_graph, validation_text = meta_validate(
+            shacl_graph, inference="rdfs"
+        )
+    if not conforms:
+        raise ValueError(f"Shapes graph is not valid SHACL:\n{validation_text}")
+    with _graph_memos_lock:
+        if (memo := _graph_memo(shacl_graph)) is not None:
+            memo.verified = True
+
+
+# Namespaces of classes which RDFS inference may assign to any node.
+_RDFS_VOCABULARIES = (str(RDF), str(RDFS), str(XSD))
+
+# Prefixes of the IRIs which pyshacl accepts in ``use_shapes``.
+_USABLE_SHAPE_IRIS = ("http:", "https:", "urn:", "file:")
+
+# Predicates of shapes which aren't parameters of constraints, so that a shape with only
+# these and property shapes produces no results of its own.
+_NON_CONSTRAINT_PREDICATES = frozenset(
+    (
+        RDF.type,
+        RDFS.comment,
+        RDFS.label,
+        SH.deactivated,
+        SH.defaultValue,
+        SH.description,
+        SH.group,
+        SH.message,
+        SH.name,
+        SH.order,
+        SH.path,
+        SH.property,
+        SH.severity,
+        SH.target,
+        SH.targetClass,
+        SH.targetNode,
+        SH.targetObjectsOf,
+        SH.targetSubjectsOf,
+    )
+)
+
+
+# Predicates whose objects are shapes, and predicates whose objects are lists of shapes.
+_SHAPE_PREDICATES = (SH.node, SH.property, SH["not"], SH.qualifiedValueShape)
+_SHAPE_LIST_PREDICATES = (SH["and"], SH["or"], SH.xone)
+
 
+class _ShapeTargetIndex:
+    """The targets of the shapes of a shapes graph.
 
-def validate_graph(data_graph: Graph, shacl_graph: Graph) -> Tuple[bool, Graph]:
-    conforms, validation_graph, _validation_text = validate(
-        data_graph,
-        shacl_graph=shacl_graph,
-        advanced=True,
-        inference="rdfs",
-        meta_shacl=True,
-        do_owl_imports=True,
-        js=True,
+    Used to skip the shapes whose targets can't match anything in a data graph (see
+    `split`). Built once per shapes graph created by this package (see
+    `_shape_target_index`).
+    """
+
+    def __init__(self, shacl_graph: Graph):
+        #: Target declarations (``sh:targetClass``, ...) per shape
+        self.targets: Dict[Node, List[Tuple[Node, Node]]] = {}
+        for predicate in (
+            SH.targetClass,
+            SH.targetNode,
+            SH.targetSubjectsOf,
+            SH.targetObjectsOf,
+            SH.target,
+        ):
+            for shape, target in shacl_graph.subject_objects(predicate):
+                self.targets.setdefault(shape, []).append((predicate, target))
+        # Shapes which are also classes target their own instances.
+        class_types = {RDFS.Class, *shacl_graph.subjects(RDFS.subClassOf, RDFS.Class)}
+        for class_type in class_types:
+            for shape in shacl_graph.subjects(RDF.type, class_type):
+                if self._is_shape(shacl_graph, shape):
+                    self.targets.setdefault(shape, []).append((SH.targetClass, shape))
+        # Rules may add arbitrary triples to the data graph while it is validated.
+        self.has_rules = (None, SH.rule, None) in shacl_graph
+        #: Shapes referenced by each shape using ``sh:node``, ``sh:property``, ...
+        self.references: Dict[Node, List[Node]] = {}
+        for predicate in _SHAPE_PREDICATES:
+            for shape, other in shacl_graph.subject_objects(predicate):
+                self.references.setdefault(shape, []).append(other)
+        for predicate in _SHAPE_LIST_PREDICATES:
+            for shape, shapes in shacl_graph.subject_objects(predicate):
+                self.references.setdefault(shape, []).extend(shacl_graph.items(shapes))
+        #: Highest severity of the results each targeted shape can produce
+        self.severities = {
+            shape: self._max_severity(shacl_graph, shape, set())
+            for shape in self.targets
+        }
+
+    @staticmethod
+    def _max_severity(shacl_graph: Graph, shape: Node, seen: set) -> SeverityLevel:
+        """Return the highest severity of ``shape`` and its property shapes."""
+        seen.add(shape)
+        level = SeverityLevel.INFO
+        if any(
+            predicate not in _NON_CONSTRAINT_PREDICATES
+            for predicate in shacl_graph.predicates(shape)
+        ):
+            severity = shacl_graph.value(shape, SH.severity, default=SH.Violation)
+            level = SeverityLevel.from_graph(severity, shacl_graph)
+        for property_shape in shacl_graph.objects(shape, SH.property):
+            if property_shape not in seen:
+                property_level = _ShapeTargetIndex._max_severity(
+                    shacl_graph, property_shape, seen
+                )
+                level = max(level, property_level, key=lambda level: level.rank)
+        return level
+
+    @staticmethod
+    def _is_shape(shacl_graph: Graph, node: Node) -> bool:
+        return any(
+            (node, RDF.type, shape_type) in shacl_graph
+            for shape_type in (SH.NodeShape, SH.PropertyShape)
+        )
+
+    def with_references(self, shapes: List[Node]) -> List[Node]:
+        """Return ``shapes`` and the IRIs of all shapes they reference, transitively.
+
+        pyshacl ignores references to shapes which aren't passed as ``use_shapes``, so
+        these must be validated along with ``shapes``.
+        """
+        selected = dict.fromkeys(shapes)
+        reached, queue = set(shapes), list(shapes)
+        while queue:
+            for other in self.references.get(queue.pop(), ()):
+                if other not in reached:
+                    reached.add(other)
+                    queue.append(other)
+                    if isinstance(other, URIRef):
+                        selected[other] = None
+        return list(selected)
+
+    def split(
+        self,
+        data_graph: Graph,
+        inference: str = "none",
+        schema: SchemaClosure | None = None,
+    ) -> Tuple[List[Node], List[Node]] | None:
+        """Split the targeted shapes into those which may match ``data_graph`` and not.
+
+        ``inference`` and ``schema`` are taken into account as in `validate_graph`.
+        Class targets match instances of subclasses and, with inference, instances
+        entailed by domains and ranges. Node targets and SPARQL-based targets always
+        match. Returns ``None`` if the shapes can't be split.
+        """
+        if self.has_rules:
+            return None
+
+        classes = set(data_graph.objects(None, RDF.type))
+        properties = set(data_graph.predicates(unique=True))
+        if inference != "none":
+            schema_triples = [
+                triple
+                for predicate in (
+                    RDFS.subClassOf,
+                    RDFS.subPropertyOf,
+                    RDFS.domain,
+                    RDFS.range,
+                )
+                for triple in data_graph.triples((None, predicate, None))
+            ]
+            if schema_triples:
+                # The data graph extends the schema, so the closure must be computed
+                # again. Data graphs rarely contain schema-level triples.
+                ontology = Graph()
+                if schema is not None:
+                    ontology += schema.graph
+                ontology.addN((s, p, o, ontology) for s, p, o in schema_triples)
+                schema = SchemaClosure.compute(ontology)
+            if schema is not None:
+                for prop in list(properties):
+                    properties.update(schema._superproperties.get(prop, ()))
+                for prop in properties:
+                    classes.update(schema._domains.get(prop, ()))
+                    classes.update(schema._ranges.get(prop, ()))
+                for class_ in list(classes):
+                    classes.update(schema._superclasses.get(class_, ()))
+        # Like pyshacl, follow the class hierarchy of the data graph in any case.
+        if (None, RDFS.subClassOf, None) in data_graph:
+            for class_ in list(classes):
+                classes.update(data_graph.transitive_objects(class_, RDFS.subClassOf))
+
+        def may_match(predicate: Node, target: Node) -> bool:
+            if predicate == SH.targetClass:
+                return target in classes or (
+                    inference != "none" and str(target).startswith(_RDFS_VOCABULARIES)
+                )
+            if predicate in (SH.targetSubjectsOf, SH.targetObjectsOf):
+                return target in properties
+            return True
+
+        matching, skipped = [], []
+        for shape, targets in self.targets.items():
+            if any(may_match(predicate, target) for predicate, target in targets):
+                matching.append(shape)
+            else:
+                skipped.append(shape)
+        return matching, skipped
+
+
+def _shape_target_index(shacl_graph: Graph) -> _ShapeTargetIndex:
+    with _graph_memos_lock:
+        memo = _graph_memo(shacl_graph)
+        if memo is not None and memo.target_index is not None:
+            return memo.target_index
+    with span("index_shape_targets"):
+        index = _ShapeTargetIndex(shacl_graph)
+    with _graph_memos_lock:
+        if (memo := _graph_memo(shacl_graph)) is not None:
+            memo.target_index = index
+    return index
+
+
+def _select_shapes(
+    data_graph: Graph,
+    shacl_graph: Graph,
+    inference: str,
+    schema: SchemaClosure | None,
+    min_severity: SeverityLevel = SeverityLevel.INFO,
+) -> List[str] | None:
+    """Select the shapes of ``shacl_graph`` which need to validate ``data_graph``.
+
+    Shapes which can only produce results below ``min_severity`` are not selected.
+    Shapes referenced by selected shapes (e.g. using ``sh:node``) are always selected,
+    whatever their targets and severities.
+    Returns the IRIs to pass to pyshacl as ``use_shapes``, or ``None`` to use all
+    shapes. An empty list means that no shape needs to validate the data graph.
+    """
+    with span("select_shapes") as trace:
+        index = _shape_target_index(shacl_graph)
+        split = index.split(data_graph, inference, schema)
+        if split is None:
+            return None
+        matching, skipped = split
+        below_severity = [
+            shape
+            for shape in matching
+            if index.severities[shape].rank < min_severity.rank
+        ]
+        selected = index.with_references(
+            [shape for shape in matching if shape not in below_severity]
+        )
+        # Shapes referenced by selected shapes are validated, even if their own targets
+        # don't match the data graph or their results are below `min_severity`. Those
+        # results are dropped by `_drop_results_below`.
+        selected_shapes = set(selected)
+        skipped = [shape for shape in skipped if shape not in selected_shapes]
+        below_severity = [
+            shape for shape in below_severity if shape not in selected_shapes
+        ]
+        trace.set(
+            matching_shapes=len(selected),
+            skipped_shapes=len(skipped),
+            below_severity_shapes=len(below_severity),
+        )
+        if not skipped and not below_severity:
+            return None
+        if not all(
+            isinstance(shape, URIRef) and shape.lower().startswith(_USABLE_SHAPE_IRIS)
+            for shape in selected
+        ):
+            # pyshacl can only be restricted to shapes by their IRIs.
+            return None
+    if logger.isEnabledFor(logging.DEBUG):
+        for reason, shapes in (
+            ("whose targets don't match the data graph", skipped),
+            (f"whose results are all below {min_severity}", below_severity),
+        ):
+            if shapes:
+                logger.debug(
+                    "Skipping %d shapes %s:\n%s",
+                    len(shapes),
+                    reason,
+                    "\n".join(sorted(format_node(shape) for shape in shapes)),
+                )
+    return [str(shape) for shape in selected]
+
+
+def _cached_graph_hash(graph: Graph) -> str:
+    with _graph_memos_lock:
+        memo = _graph_memo(graph)
+        if memo is not None and memo.hash is not None:
+            return memo.hash
+    digest = graph_hash(graph)
+    with _graph_memos_lock:
+        if (memo := _graph_memo(graph)) is not None:
+            memo.hash = digest
+    return digest
+
+
+def _validation_cache_key(
+    data_graph: Graph,
+    shacl_graph: Graph,
+    inference: str,
+    schema: SchemaClosure | None,
+    min_severity: SeverityLevel,
+    fail_fast: bool,
+    js_runtime: JSRuntime,
+) -> str:
+    from pyshacl import __version__ as pyshacl_version
+
+    with span("hash_data_graph", data_triples=len(data_graph)):
+        data_hash = graph_hash(data_graph)
+    # Results are attributed to the policies by the names of their graphs.
+    policy_graphs = (
+        sorted(str(graph.identifier) for graph in shacl_graph.contexts())
+        if isinstance(shacl_graph, Dataset)
+        else []
+    )
+    # The scripts of SHACL-JS libraries may change without the shapes graph changing.
+    js_libraries = sorted(
+        (str(url), js_runtime.library_digest(str(url)))
+        for url in set(shacl_graph.objects(None, SH.jsLibraryURL))
+    )
+    return make_cache_key(
+        "validation",
+        __version__,
+        pyshacl_version,
+        data_hash,
+        _cached_graph_hash(shacl_graph),
+        policy_graphs,
+        js_libraries,
+        inference,
+        _cached_graph_hash(schema.graph) if schema is not None else None,
+        min_severity.name,
+        fail_fast,
     )
 
-    # Read the whole SHACL vocabulary into the graph so that we can use additional info
-    # such as labels and descriptions.
-    validation_graph.parse(SH._NS)
+
+def _empty_validation_graph() -> Graph:
+    """Create the validation graph of a data graph which no shape targets."""
+    validation_graph = Graph()
+    report = BNode()
+    validation_graph.add((report, RDF.type, SH.ValidationReport))
+    validation_graph.add((report, SH.conforms, Literal(True)))
+    return validation_graph
+
+
+def _drop_results_below(validation_graph: Graph, min_severity: SeverityLevel) -> bool:
+    """Remove the results below ``min_severity``. Returns whether none are left."""
+    report = validation_graph.value(None, RDF.type, SH.ValidationReport)
+    for result in list(validation_graph.objects(report, SH.result)):
+        severity = validation_graph.value(result, SH.resultSeverity)
+        if (
+            SeverityLevel.from_graph(severity, validation_graph).rank
+            < min_severity.rank
+        ):
+            validation_graph.remove((report, SH.result, result))
+            remove_closure(validation_graph, result)
+    conforms = (report, SH.result, None) not in validation_graph
+    validation_graph.set((report, SH.conforms, Literal(conforms)))
+    return conforms
+
+
+def validate_graph(
+    data_graph: Graph,
+    shacl_graph: Graph,
+    inference: str = "rdfs",
+    schema: SchemaClosure | None = None,
+    js_runtime: JSRuntime | None = None,
+    cache: FileCache | None = None,
+    min_severity: SeverityLevel = SeverityLevel.INFO,
+    fail_fast: bool = False,
+) -> Tuple[bool, Graph]:
+    """Validate ``data_graph`` against ``shacl_graph``.
+
+    ``inference`` is one of `config.INFERENCE_MODES`. With ``"rdfs"``, pyshacl computes
+    the RDFS closure of the data graph and the ``schema``, if given. With
+    ``"precomputed"``, the data graph is only expanded using the ``schema`` (see
+    `SchemaClosure.expand`).
+
+    ``owl:imports`` in the shapes graph are not followed. They are resolved when the
+    shapes graph is created by `make_shacl_graph`.
+
+    Shapes whose targets can't match anything in the data graph are skipped. They are
+    logged at the ``DEBUG`` level.
+
+    Results below ``min_severity`` are dropped from the validation graph, and shapes
+    which can only produce such results are skipped. The data graph conforms if no
+    results are left. With ``fail_fast``, validation stops at the first constraint which
+    produces such results, so the validation graph holds only some of the results.
+
+    SHACL-JS code is run using ``js_runtime``, or the runtime shared by all
+    validations of the process (see `javascript.default_runtime`).
+
+    If a ``cache`` is given, validation graphs are stored in it, keyed by hashes of
+    the data graph (see `rdf_helpers.graph_hash`), the shapes graph, the SHACL-JS
+    libraries as read by ``js_runtime``, and the options.
+    Validating the same data graph again returns the stored validation graph.
+    """
+    from pyshacl import validate
+
+    # This is a no-op for shapes graphs created by `make_shacl_graph`.
+    verify_shacl_graph(shacl_graph)
+    register_sets(shacl_graph)
+    js_runtime = js_runtime if js_runtime is not None else default_runtime()
+
+    cache_key = None
+    if cache is not None:
+        cache_key = _validation_cache_key(
+            data_graph,
+            shacl_graph,
+            inference,
+            schema,
+            min_severity,
+            fail_fast,
+            js_runtime,
+        )
+        if (cached := cache.get(cache_key)) is not None:
+            with span("read_cached_validation_graph"):
+                # `read_rdf_resource` binds the prefixes.
+                validation_graph = read_rdf_resource(format="nt", data=cached)
+            conforms = (None, SH.conforms, Literal(True)) in validation_graph
+            return conforms, validation_graph
+
+    options = {
+        "inference": inference,
+        "ont_graph": None,
+        "inplace": False,
+        # Results below `min_severity` don't stop validation with `abort_on_first`.
+        "allow_infos": min_severity.rank > SeverityLevel.INFO.rank,
+        "allow_warnings": min_severity.rank > SeverityLevel.WARNING.rank,
+    }
+    if inference == "rdfs" and schema is not None:
+        options["ont_graph"] = schema.graph
+    elif inference == "precomputed":
+        with span("expand_data_graph"):
+            if schema is not None:
+                data_graph = schema.expand(data_graph)
+        # The expanded graph is a copy, so pyshacl doesn't need to make another one.
+        options.update(inference="none", inplace=schema is not None)
+
+    use_shapes = _select_shapes(
+        data_graph, shacl_graph, options["inference"], schema, min_severity
+    )
+    if use_shapes == []:
+        # No shape needs to validate the data graph.
+        conforms, validation_graph = True, _empty_validation_graph()
+    else:
+        with (
+            span(
+                "validate_graph",
+                data_triples=len(data_graph),
+                shapes_triples=len(shacl_graph),
+                inference=inference,
+            ) as trace,
+            js_runtime.activate(),
+        ):
+            for abort_on_first in (True, False) if fail_fast else (False,):
+                pyshacl_conforms, validation_graph, _validation_text = validate(
+                    data_graph,
+                    shacl_graph=shacl_graph,
+                    advanced=True,
+                    meta_shacl=False,
+                    # Imports were resolved by `make_shacl_graph` and
+                    # `make_shacl_graphs`.
+                    do_owl_imports=False,
+                    js=True,
+                    use_shapes=use_shapes,
+                    abort_on_first=abort_on_first,
+                    **options,
+                )
+                conforms = _drop_results_below(validation_graph, min_severity)
+                # pyshacl ignores the severity of SPARQL and SHACL-JS constraints when
+                # aborting, so it may have stopped at a result which was dropped.
+                if pyshacl_conforms or not conforms:
+                    break
+            trace.set(conforms=conforms, validation_triples=len(validation_graph))
+
+    if isinstance(shacl_graph, Dataset):
+        _attribute_results(validation_graph, shacl_graph)
 
     # Bind namespace prefixes for better readability. These _should_ already be bound;
     # we're just making sure.
     for prefix, iri in PREFIXES.items():
         validation_graph.bind(prefix, iri, replace=True)
 
+    if cache_key is not None:
+        cache.put(cache_key, validation_graph.serialize(format="nt", encoding="utf-8"))
     return conforms, validation_graph
 
 
-def make_shacl_graph(config: Config) -> Graph:
-    shacl_graphs = []
-    # TODO: We're only using the values. Make use of the keys which contain the config
-    # names of the policies.
-    for policy in config.policies.values():
-        policy_graph = read_rdf_resource(policy.source)
-        shacl_graph = parameterize_graph(policy_graph, policy.parameters)
-        shacl_graphs.append(shacl_graph)
-    return reduce(operator.add, shacl_graphs, Graph())
+def _attribute_results(validation_graph: Graph, shacl_graph: Dataset) -> None:
+    """Tag results with the name of the policy whose named graph holds their shape."""
+    names = {}
+    for result in list(validation_graph.objects(None, SH.result)):
+        shape = validation_graph.value(result, SH.sourceShape, None)
+        if shape not in names:
+            contexts = (c for _s, _p, _o, c in shacl_graph.quads((shape, None, None)))
+            names[shape] = next(
+                (n for c in contexts if (n := policy_config_name(c)) is not None), None
+            )
+        if names[shape] is not None:
+            validation_graph.add(
+                (result, SCIMPL.policyConfigName, Literal(names[shape]))
+            )
+
+
+_POLICY_GRAPH_PREFIX = f"{SCIMPL._NS}policy-"
+
+
+def policy_graph_identifier(name: str) -> URIRef:
+    """Return the identifier of the named graph holding the policy called ``name``."""
+    return URIRef(_POLICY_GRAPH_PREFIX + quote(name, safe=""))
+
+
+def policy_config_name(identifier: Node) -> str | None:
+    """Return the policy name for a named graph identifier, if it refers to a policy."""
+    if isinstance(identifier, URIRef) and identifier.startswith(_POLICY_GRAPH_PREFIX):
+        return unquote(identifier[len(_POLICY_GRAPH_PREFIX) :])
+    return None
+
+
+def dump_shacl_graph(shacl_graph: Graph) -> bytes:
+    """Serialize a shapes graph, keeping the named graphs of a dataset."""
+    format = "nquads" if isinstance(shacl_graph, Dataset) else "nt"
+    return shacl_graph.serialize(format=format, encoding="utf-8")
+
+
+def load_shacl_graph(data: bytes) -> Dataset:
+    """Read a shapes graph serialized using `dump_shacl_graph`."""
+    shacl_graph = Dataset(default_union=True)
+    # N-Triples are a subset of N-Quads and end up in the default graph.
+    shacl_graph.parse(data=data, format="nquads")
+    for prefix, iri in PREFIXES.items():
+        shacl_graph.bind(prefix, iri, replace=True)
+    _own_graph(shacl_graph)
+    return shacl_graph
+
+
+#: Maximum number of policy documents (policies and their imports) fetched at once
+MAX_CONCURRENT_FETCHES = 8
+
+# The documents of a policy: the policy itself and the documents it imports, each as
+# a pair of its source and its contents.
+_PolicyDocuments = Tuple[Tuple[str, bytes], ...]
+
+
+class PolicyLoadError(Exception):
+    """Raised if a policy of a config can't be fetched, parsed, or parameterized."""
+
+    def __init__(self, name: str, source: str, reason: Exception):
+        super().__init__(
+            f"Policy '{name}' could not be loaded from '{source}': {reason}"
+        )
+        #: Key of the policy in ``config.policies``
+        self.name = name
+        #: The policy or imported document which could not be loaded
+        self.source = source
+
+
+class OntologyLoadError(Exception):
+    """Raised if an ontology of a config can't be fetched or parsed."""
+
+    def __init__(self, source: str, reason: Exception):
+        super().__init__(f"Ontology could not be loaded from '{source}': {reason}")
+        #: The ontology which could not be loaded
+        self.source = source
+
+
+class _DocumentFetcher:
+    """Fetches documents on a bounded number of threads, each document only once.
+
+    Policies which import the same document share a single fetch, even if it is still
+    in progress.
+    """
+
+    def __init__(self, fetcher: Fetcher, executor: ThreadPoolExecutor):
+        self._fetcher = fetcher
+        self._executor = executor
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, iri: str) -> Future:
+        with self._lock:
+            if (future := self._futures.get(iri)) is None:
+                future = self._executor.submit(self._fetcher.fetch, iri)
+                self._futures[iri] = future
+        return future
+
+
+def _resolve_imports(
+    name: str, source: str, data: bytes, documents: _DocumentFetcher
+) -> _PolicyDocuments:
+    """Collect the documents of the ``owl:imports`` closure of the policy ``name``.
+
+    Imports are fetched concurrently, one level of the import tree at a time. Every IRI
+    is followed only once, which also ends import cycles, and documents whose contents
+    were already included under another IRI are skipped.
+    """
+    policy_documents = [(source, data)]
+    seen_iris = {resource_base(source)}
+    seen_hashes = {hashlib.sha256(data).digest()}
+    level = policy_documents
+    while level:
+        imports = []
+        for document_source, document_data in level:
+            try:
+                graph = _read_document(document_source, document_data)
+            except Exception as e:
+                raise PolicyLoadError(name, document_source, e) from e
+            # Sorted, so that the documents are merged in the same order on every run.
+            for iri in sorted(map(str, graph.objects(None, OWL.imports))):
+                if iri not in seen_iris:
+                    seen_iris.add(iri)
+                    imports.append((iri, documents.submit(iri)))
+
+        level = []
+        for iri, future in imports:
+            try:
+                imported_data = future.result()
+            except Exception as e:
+                raise PolicyLoadError(name, iri, e) from e
+            if (digest := hashlib.sha256(imported_data).digest()) not in seen_hashes:
+                seen_hashes.add(digest)
+                level.append((iri, imported_data))
+        policy_documents.extend(level)
+    return tuple(policy_documents)
+
+
+def _fetch_policy(
+    name: str, source: str, documents: _DocumentFetcher
+) -> _PolicyDocuments:
+    with span("fetch_policy", policy=name, source=source) as trace:
+        try:
+            data = documents.submit(resource_base(source)).result()
+        except Exception as e:
+            raise PolicyLoadError(name, source, e) from e
+        policy_documents = _resolve_imports(name, source, data, documents)
+        trace.set(
+            bytes=sum(len(data) for _source, data in policy_documents),
+            imports=len(policy_documents) - 1,
+        )
+    return policy_documents
+
+
+def _fetch_policies(
+    config: Config, fetcher: Fetcher | None
+) -> Dict[str, _PolicyDocuments]:
+    """Fetch the documents of all policies of ``config`` concurrently.
+
+    At most `MAX_CONCURRENT_FETCHES` documents are fetched at once. The result is in
+    the order of ``config.policies``, regardless of the order in which the fetches
+    complete. If several policies fail to load, the error of the first one is raised.
+    """
+    fetcher = fetcher or Fetcher()
+    # Policies wait for their imports on threads of their own, so that they never
+    # block the threads which fetch the documents.
+    with (
+        ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES) as fetch_executor,
+        ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES) as policy_executor,
+    ):
+        documents = _DocumentFetcher(fetcher, fetch_executor)
+        futures = {
+            name: policy_executor.submit(
+                # Run in a copy of the context, so that spans are still recorded.
+                copy_context().run,
+                _fetch_policy,
+                name,
+                policy.source,
+                documents,
+            )
+            for name, policy in config.policies.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def _fetch_enumerations(config: Config, fetcher: Fetcher | None) -> Dict[str, bytes]:
+    """Fetch the files which hold the values of parameters (see `enumerations`).
+
+    Local files are resolved against the directory of the config file, if any.
+    """
+    fetcher = fetcher or Fetcher()
+    enumerations = {}
+    for name, policy in config.policies.items():
+        for source in enumeration_files(policy.parameters):
+            if source not in enumerations:
+                path = source
+                if not is_url(source) and config.directory is not None:
+                    path = config.directory / source
+                with span("fetch_enumeration", policy=name, source=source):
+                    try:
+                        enumerations[source] = fetcher.fetch(path)
+                    except Exception as e:
+                        raise PolicyLoadError(name, source, e) from e
+    return enumerations
+
+
+def _parameterize_policies(
+    config: Config,
+    policy_documents: Dict[str, _PolicyDocuments],
+    enumerations: Dict[str, bytes],
+) -> Dict[str, Graph]:
+    shacl_graphs = {}
+    for name, policy in config.policies.items():
+        with span("parameterize_policy", policy=name) as trace:
+            try:
+                # Templates are shared between configs which use the same policies.
+                template = _compile_policy(policy_documents[name])
+                shacl_graphs[name] = template.instantiate(
+                    resolve_enumerations(policy.parameters, enumerations)
+                )
+            except Exception as e:
+                raise PolicyLoadError(name, policy.source, e) from e
+            trace.set(triples=len(shacl_graphs[name]))
+    return shacl_graphs
+
+
+def make_shacl_graphs(
+    config: Config, fetcher: Fetcher | None = None
+) -> Dict[str, Graph]:
+    """Create one parameterized shapes graph per policy of ``config``.
+
+    The graphs are keyed by the names of the policies in the config and are checked
+    using `verify_shacl_graph`.
+    """
+    shacl_graphs = _parameterize_policies(
+        config,
+        _fetch_policies(config, fetcher),
+        _fetch_enumerations(config, fetcher),
+    )
+    for name, shacl_graph in shacl_graphs.items():
+        _own_graph(shacl_graph)
+        try:
+            verify_shacl_graph(shacl_graph)
+        except ValueError as e:
+            raise PolicyLoadError(name, config.policies[name].source, e) from e
+    return shacl_graphs
+
+
+def make_shacl_graph(
+    config: Config, cache: FileCache | None = None, fetcher: Fetcher | None = None
+) -> Dataset:
+    """Create the combined and parameterized shapes graph for ``config``.
+
+    The result is a dataset which holds each policy in a named graph (see
+    `policy_graph_identifier`) and whose default graph is the union of all policies.
+
+    If a ``cache`` is given, the result is looked up using a key derived from the config
+    and the contents of all policies, and stored there after it has been created. The
+    policies are read using ``fetcher``. The result is checked using
+    `verify_shacl_graph`, so that later validations can skip this step.
+    """
+    policy_documents = _fetch_policies(config, fetcher)
+    enumerations = _fetch_enumerations(config, fetcher)
+
+    if cache is not None:
+        # The package version is part of the key, as processing may change with it.
+        cache_key = make_cache_key(
+            __version__,
+            asdict(config),
+            *(
+                part
+                for documents in policy_documents.values()
+                for document in documents
+                for part in document
+            ),
+            *(part for enumeration in enumerations.items() for part in enumeration),
+        )
+        with span("read_shapes_cache") as trace:
+            cached = cache.get(cache_key)
+            trace.set(hit=cached is not None)
+        if cached is not None:
+            # Only verified graphs are written to the cache.
+            shacl_graph = load_shacl_graph(cached)
+            mark_shacl_graph_verified(shacl_graph)
+            return shacl_graph
+
+    # Stream the triples of every policy into its named graph. Unlike adding up the
+    # graphs, this copies every triple only once.
+    shacl_graph = Dataset(default_union=True)
+    for prefix, iri in PREFIXES.items():
+        shacl_graph.bind(prefix, iri, replace=True)
+    shacl_graphs = _parameterize_policies(config, policy_documents, enumerations)
+    for name, policy_graph in shacl_graphs.items():
+        named_graph = shacl_graph.graph(policy_graph_identifier(name))
+        named_graph.addN((s, p, o, named_graph) for s, p, o in policy_graph)
+    _own_graph(shacl_graph)
+    verify_shacl_graph(shacl_graph)
+
+    if cache is not None:
+        cache.put(cache_key, dump_shacl_graph(shacl_graph))
+
+    return shacl_graph
+
+
+def make_schema_closure(
+    config: Config, cache: FileCache | None = None, fetcher: Fetcher | None = None
+) -> SchemaClosure | None:
+    """Compute the `SchemaClosure` of the ontologies of ``config``, if there are any.
+
+    Like `make_shacl_graph`, the result is looked up in and stored to the ``cache``.
+    Raises an `OntologyLoadError` if an ontology can't be fetched or parsed.
+    """
+    if not config.ontologies:
+        return None
+    fetcher = fetcher or Fetcher()
+    ontology_data = {}
+    for source in config.ontologies:
+        with span("fetch_ontology", source=source):
+            try:
+                ontology_data[source] = fetcher.fetch(source)
+            except Exception as e:
+                raise OntologyLoadError(source, e) from e
+
+    if cache is not None:
+        cache_key = make_cache_key(
+            __version__, config.ontologies, *ontology_data.values()
+        )
+        if (cached := cache.get(cache_key)) is not None:
+            return SchemaClosure.load(cached)
+
+    with span("compute_schema_closure") as trace:
+        ontology = Graph()
+        for source, data in ontology_data.items():
+            try:
+                _read_document(source, data, ontology)
+            except Exception as e:
+                raise OntologyLoadError(source, e) from e
+        schema = SchemaClosure.compute(ontology)
+        trace.set(ontology_triples=len(ontology), closure_triples=len(schema.graph))
+
+    if cache is not None:
+        cache.put(cache_key, schema.dump())
+    return schema
+
+
+def merge_validation_graphs(validation_graphs: Dict[str, Graph]) -> Graph:
+    """Merge the validation graphs of several policies into one validation graph.
+
+    The ``validation_graphs`` are keyed by the names of the policies in the config. Each
+    result in the merged report is attributed to its policy using
+    `scimpl:policyConfigName`.
+    """
+    merged_graph = Graph()
+    merged_report = BNode()
+    conforms = True
+    for name, validation_graph in validation_graphs.items():
+        report = validation_graph.value(None, RDF.type, SH.ValidationReport)
+        conforms = conforms and (report, SH.conforms, Literal(True)) in validation_graph
+        for triple in validation_graph:
+            if triple[0] != report:
+                merged_graph.add(triple)
+        for result in validation_graph.objects(report, SH.result):
+            merged_graph.add((merged_report, SH.result, result))
+            merged_graph.add((result, SCIMPL.policyConfigName, Literal(name)))
+    merged_graph.add((merged_report, RDF.type, SH.ValidationReport))
+    merged_graph.add((merged_report, SH.conforms, Literal(conforms)))
+    for prefix, iri in PREFIXES.items():
+        merged_graph.bind(prefix, iri, replace=True)
+    return merged_graph
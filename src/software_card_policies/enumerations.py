@@ -0,0 +1,167 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+"""Large enumerations as parameters of policies.
+
+A parameter with the outer type ``scimpl:Set`` stands in for a set of values, such as
+the SPDX license list or an allow-list of ORCID iDs. Unlike an ``rdf:List`` used with
+``sh:in``, the values are not turned into list cells. The whole set is a single literal
+(see `add_set`), and ``scimpl:inSet`` checks the value nodes by a hashed lookup::
+
+    scex:suggestedLicenses a sc:Parameter ;
+        sc:parameterOuterType scimpl:Set ;
+        sc:parameterInnerType xsd:anyURI ;
+        sc:parameterConfigPath "suggested_licenses" ;
+        sc:parameterDefaultValue ( "https://spdx.org/licenses/MIT" ) .
+
+    scex:licenseRequirements a sh:NodeShape ;
+        sh:property [ sh:path schema:license ; scimpl:inSet scex:suggestedLicenses ] .
+
+Both are extensions of this implementation, not part of the Software CaRD
+specification.
+
+In the config, the values of a parameter can be given as a list, or as a file with one
+value per line. Relative paths are resolved against the directory of the config
+file::
+
+    [policies.licenses.parameters]
+    suggested_licenses = {file = "spdx-licenses.txt"}
+"""
+
+import hashlib
+import threading
+import weakref
+from functools import cache
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from rdflib import Graph, Literal, Node, URIRef
+
+from software_card_policies.namespaces import SCIMPL
+from software_card_policies.rdf_helpers import ntriples_term
+
+_IN_SET_COMPONENT = f"""
+@prefix scimpl: <{SCIMPL._NS}> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+
+scimpl:InSetConstraintComponent a sh:ConstraintComponent ;
+    sh:parameter scimpl:InSetConstraintComponent-inSet ;
+    sh:validator scimpl:valueInSet .
+
+scimpl:InSetConstraintComponent-inSet sh:path scimpl:inSet .
+
+scimpl:valueInSet a sh:SPARQLAskValidator ;
+    # The result only depends on the value.
+    scimpl:memoize true ;
+    sh:message "Value {{$value}} is not one of the allowed values." ;
+    sh:ask \"\"\"ASK {{ FILTER(<{SCIMPL.setContains}>($value, $inSet)) }}\"\"\" .
+"""
+
+
+class _Members(frozenset):
+    """The members of a set as N-Triples terms.
+
+    Unlike frozensets, these can be referenced weakly.
+    """
+
+
+# The members of the sets of the registered shapes graphs, by set node. Sets are
+# identified by the hash of their members, so they never change. The shapes graphs hold
+# on to their sets, which are dropped along with the last graph using them.
+_sets: "weakref.WeakValueDictionary[URIRef, _Members]" = weakref.WeakValueDictionary()
+_graph_sets: "weakref.WeakKeyDictionary[Graph, List[_Members]]" = (
+    weakref.WeakKeyDictionary()
+)
+_sets_lock = threading.Lock()
+
+
+def is_file_reference(value: Any) -> bool:
+    """Check whether a config parameter refers to a file (``{file = "..."}``)."""
+    return isinstance(value, dict) and isinstance(value.get("file"), str)
+
+
+def enumeration_files(parameters: Dict[str, Any]) -> Iterator[str]:
+    """Yield the files referred to by the ``parameters`` of a policy."""
+    for value in parameters.values():
+        if is_file_reference(value):
+            yield value["file"]
+
+
+def read_enumeration(data: bytes) -> List[str]:
+    """Read the values of a file with one value per line.
+
+    Leading and trailing whitespace is stripped. Empty lines and lines starting with
+    ``#`` are skipped.
+    """
+    values = []
+    for line in data.decode("utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            values.append(line)
+    return values
+
+
+def resolve_enumerations(
+    parameters: Dict[str, Any], enumerations: Dict[str, bytes]
+) -> Dict[str, Any]:
+    """Replace the file references of ``parameters`` by the values of the files.
+
+    ``enumerations`` holds the contents of the files by their source as given in the
+    config.
+    """
+    return {
+        name: (
+            read_enumeration(enumerations[value["file"]])
+            if is_file_reference(value)
+            else value
+        )
+        for name, value in parameters.items()
+    }
+
+
+@cache
+def in_set_component() -> Tuple[Tuple[Node, Node, Node], ...]:
+    """Return the triples which define the ``scimpl:inSet`` constraint component."""
+    return tuple(Graph().parse(data=_IN_SET_COMPONENT, format="turtle"))
+
+
+def add_set(graph: Graph, members: Iterable[Node]) -> URIRef:
+    """Add a set with the given ``members`` to ``graph`` and return its node.
+
+    The node is derived from the members, so that equal sets share their node.
+    """
+    lexical = "\n".join(sorted({ntriples_term(member) for member in members}))
+    digest = hashlib.sha256(lexical.encode("utf-8")).hexdigest()
+    node = URIRef(f"urn:sha256:{digest}")
+    graph.add((node, SCIMPL.setMembers, Literal(lexical)))
+    return node
+
+
+def register_sets(shacl_graph: Graph) -> None:
+    """Make the sets of ``shacl_graph`` available to ``scimpl:setContains``.
+
+    The sets stay available as long as ``shacl_graph`` is.
+    """
+    _install()
+    with _sets_lock:
+        if shacl_graph in _graph_sets:
+            return
+        graph_sets = []
+        for node, lexical in shacl_graph.subject_objects(SCIMPL.setMembers):
+            if (members := _sets.get(node)) is None:
+                members = _sets[node] = _Members(str(lexical).split("\n"))
+            graph_sets.append(members)
+        _graph_sets[shacl_graph] = graph_sets
+
+
+def _set_contains(value: Node, node: URIRef) -> Literal:
+    # The sets of a shapes graph are registered before it is used for validation.
+    return Literal(ntriples_term(value) in _sets[node])
+
+
+@cache
+def _install() -> None:
+    """Register ``scimpl:setContains`` with the SPARQL engine of rdflib."""
+    from rdflib.plugins.sparql.operators import register_custom_function
+
+    register_custom_function(SCIMPL.setContains, _set_contains, override=True)
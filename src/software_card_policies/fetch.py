@@ -0,0 +1,203 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+import json
+import threading
+from email.message import Message
+from http.client import HTTPConnection, HTTPException, HTTPResponse, HTTPSConnection
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlparse, urlsplit
+from urllib.request import Request, getproxies, url2pathname, urlopen
+
+from software_card_policies import __version__
+from software_card_policies.cache import FileCache, make_cache_key
+
+#: Maximum number of redirects followed for a single request
+MAX_REDIRECTS = 5
+
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+#: URL schemes of the remote resources which can be fetched
+SUPPORTED_SCHEMES = ("http", "https")
+
+
+def is_url(source: Path | str) -> bool:
+    """Check whether ``source`` refers to a remote resource."""
+    if isinstance(source, Path):
+        return False
+    result = urlparse(source)
+    return bool(result.scheme and result.netloc) and result.scheme != "file"
+
+
+def _local_path(source: Path | str) -> Path:
+    if isinstance(source, str) and source.startswith("file:"):
+        return Path(url2pathname(urlparse(source).path))
+    return Path(source)
+
+
+def resource_base(source: Path | str) -> str:
+    """Return the base IRI against which relative IRIs in ``source`` are resolved."""
+    if is_url(source):
+        return str(source)
+    return _local_path(source).absolute().as_uri()
+
+
+def _check_scheme(url: str) -> None:
+    if (scheme := urlsplit(url).scheme.lower()) not in SUPPORTED_SCHEMES:
+        raise ValueError(
+            f"Unsupported URL scheme '{scheme}' of '{url}', "
+            f"use one of {', '.join(SUPPORTED_SCHEMES)} or a local file"
+        )
+
+
+class Fetcher:
+    """Reads local files and remote resources.
+
+    If a ``cache`` is given, remote resources are stored there along with their
+    ``ETag`` and ``Last-Modified`` headers. Cached resources are revalidated using
+    conditional requests. In ``offline`` mode, remote resources are served from the
+    cache only.
+
+    Connections to remote hosts are kept open and reused by later requests. A fetcher
+    can be shared between threads, which then share its idle connections. Fetchers can
+    be pickled, e.g. to pass them to worker processes, without their connections.
+    """
+
+    def __init__(
+        self,
+        cache: FileCache | None = None,
+        offline: bool = False,
+        timeout: float = 30,
+    ):
+        if offline and cache is None:
+            raise ValueError("Offline mode requires a cache")
+        self.cache = cache
+        self.offline = offline
+        self.timeout = timeout
+        self._idle_connections: Dict[Tuple[str, str], List[HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"cache": self.cache, "offline": self.offline, "timeout": self.timeout}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def fetch(self, source: Path | str) -> bytes:
+        """Read the raw bytes of a local file or a remote resource.
+
+        Local files are given as paths or ``file:`` URLs, and remote resources as URLs
+        with one of the `SUPPORTED_SCHEMES`. Raises a ``ValueError`` for URLs with
+        other schemes.
+        """
+        if not is_url(source):
+            return _local_path(source).read_bytes()
+        _check_scheme(source)
+        if self.cache is None:
+            _status, _headers, body = self._get(source, {})
+            return body
+        return self._fetch_cached(source)
+
+    def _request(
+        self, scheme: str, netloc: str, target: str, headers: Dict[str, str]
+    ) -> Tuple[HTTPResponse, bytes]:
+        """Send a ``GET`` request using an idle connection to the host, if any."""
+        with self._lock:
+            idle_connections = self._idle_connections.get((scheme, netloc))
+            connection = idle_connections.pop() if idle_connections else None
+        if connection is None:
+            connection_class = HTTPSConnection if scheme == "https" else HTTPConnection
+            connection = connection_class(netloc, timeout=self.timeout)
+            reused = False
+        else:
+            reused = True
+
+        try:
+            try:
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+            except (HTTPException, ConnectionError):
+                if not reused:
+                    raise
+                # The server has closed the idle connection, so open it again.
+                connection.close()
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+            body = response.read()
+        except BaseException:
+            connection.close()
+            raise
+
+        with self._lock:
+            self._idle_connections.setdefault((scheme, netloc), []).append(connection)
+        return response, body
+
+    def _get(self, url: str, headers: Dict[str, str]) -> Tuple[int, Message, bytes]:
+        """Send a ``GET`` request and follow its redirects.
+
+        Raises an ``HTTPError`` for error statuses, but returns ``304`` responses.
+        """
+        headers = {"User-Agent": f"software-card-policies/{__version__}", **headers}
+        if getproxies():
+            # Leave proxies to urllib, at the expense of connection reuse.
+            try:
+                request = Request(url, headers=headers)
+                with urlopen(request, timeout=self.timeout) as response:
+                    return response.status, response.headers, response.read()
+            except HTTPError as e:
+                if e.code == 304:
+                    return e.code, e.headers, b""
+                raise
+
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            response, body = self._request(parts.scheme, parts.netloc, target, headers)
+            location = response.getheader("Location")
+            if response.status in _REDIRECT_STATUSES and location:
+                url = urljoin(url, location)
+                _check_scheme(url)
+                continue
+            if response.status >= 400:
+                raise HTTPError(
+                    url, response.status, response.reason, response.msg, None
+                )
+            return response.status, response.msg, body
+        raise HTTPError(url, response.status, "Too many redirects", response.msg, None)
+
+    def _fetch_cached(self, url: str) -> bytes:
+        key = make_cache_key(url)
+        headers, body = {}, None
+        if (entry := self.cache.get(key)) is not None:
+            header_line, body = entry.split(b"\n", 1)
+            headers = json.loads(header_line)
+
+        if self.offline:
+            if body is None:
+                raise ConnectionError(f"'{url}' is not cached and offline mode is on")
+            return body
+
+        request_headers = {}
+        if body is not None:
+            if etag := headers.get("ETag"):
+                request_headers["If-None-Match"] = etag
+            if last_modified := headers.get("Last-Modified"):
+                request_headers["If-Modified-Since"] = last_modified
+
+        status, response_headers, response_body = self._get(url, request_headers)
+        if status == 304 and body is not None:
+            # Not modified, the cached copy is still valid.
+            return body
+        body = response_body
+        headers = {
+            name: value
+            for name in ("ETag", "Last-Modified")
+            if (value := response_headers.get(name)) is not None
+        }
+
+        header_line = json.dumps(headers).encode("utf-8")
+        self.cache.put(key, header_line + b"\n" + body)
+        return body
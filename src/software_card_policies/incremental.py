@@ -0,0 +1,444 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+"""Incremental validation of metadata which changes in small steps.
+
+An `IncrementalValidator` keeps the data graph and the validation report of its last
+validation. When a new version of the data graph is validated, only the focus nodes
+which are affected by the triples added or removed since then are validated again::
+
+    validator = IncrementalValidator(shacl_graph)
+    conforms, validation_graph = validator.validate(data_graph)
+    data_graph.add((software, SCHEMA.author, person))
+    conforms, validation_graph = validator.validate(data_graph)
+
+A focus node is affected if one of the changed triples lies within the reach of the
+shapes which may target it, i.e. along the property paths of the shapes, including
+their nested shapes. The affected focus nodes are validated on the part of the data
+graph the shapes can see from them, and their new results replace their old ones in
+the report. SPARQL and JavaScript constraints may look at the whole data graph, so
+shapes graphs which use them are always validated in full, unless all of them are
+marked as pure using ``scimpl:memoize true``.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Set, Tuple
+
+from rdflib import BNode, Graph, Literal, Node
+from rdflib.namespace import RDF, RDFS, SH
+
+from software_card_policies.data_model import (
+    SchemaClosure,
+    SeverityLevel,
+    validate_graph,
+)
+from software_card_policies.javascript import JSRuntime
+from software_card_policies.namespaces import SCIMPL
+from software_card_policies.rdf_helpers import remove_closure
+from software_card_policies.tracing import span
+
+logger = logging.getLogger(__name__)
+
+Triple = Tuple[Node, Node, Node]
+
+# Triples which change the schema and thereby the entailments of any node.
+_SCHEMA_PREDICATES = (RDFS.subClassOf, RDFS.subPropertyOf, RDFS.domain, RDFS.range)
+
+# Predicates of the shapes graph whose objects are shapes applied to the same nodes
+# (``sh:node``, ...) or to the values of a property shape (``sh:property``, ...).
+_NESTED_SHAPE_PREDICATES = (
+    SH.node,
+    SH.property,
+    SH["not"],
+    SH.qualifiedValueShape,
+)
+_NESTED_SHAPE_LIST_PREDICATES = (SH["and"], SH["or"], SH.xone)
+
+# Predicates of the shapes graph which introduce SPARQL or JavaScript code.
+_CODE_PREDICATES = (
+    SH.sparql,
+    SH.js,
+    SH.target,
+    SH.rule,
+    SH.validator,
+    SH.nodeValidator,
+    SH.propertyValidator,
+)
+
+
+@dataclass
+class GraphDelta:
+    """The triples added to and removed from a data graph."""
+
+    added: Set[Triple]
+    removed: Set[Triple]
+
+    @classmethod
+    def compute(cls, old_graph: Graph, new_graph: Graph):
+        old_triples, new_triples = set(old_graph), set(new_graph)
+        return cls(new_triples - old_triples, old_triples - new_triples)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+    def nodes(self) -> Set[Node]:
+        """Return the subjects and objects of the changed triples."""
+        return {
+            node
+            for subject, _predicate, obj in (*self.added, *self.removed)
+            for node in (subject, obj)
+        }
+
+
+class _ShapeReach:
+    """How far the shapes of a shapes graph look from their focus nodes.
+
+    ``forward`` and ``inverse`` hold the predicates followed by the property paths of
+    the shapes, and ``depth`` the maximum number of steps taken from a focus node,
+    which is ``None`` if the steps are unbounded, e.g. for ``sh:zeroOrMorePath`` or
+    recursive shapes. ``is_local`` is false if the shapes use SPARQL or JavaScript
+    code which isn't marked as pure.
+    """
+
+    def __init__(self, shacl_graph: Graph):
+        self._graph = shacl_graph
+        self.forward: Set[Node] = set()
+        self.inverse: Set[Node] = set()
+        #: Predicates whose objects are targeted by ``sh:targetObjectsOf``
+        self.target_objects_of = set(shacl_graph.objects(None, SH.targetObjectsOf))
+        self.is_local = not any(
+            (code, SCIMPL.memoize, Literal(True)) not in shacl_graph
+            for predicate in _CODE_PREDICATES
+            for code in shacl_graph.objects(None, predicate)
+        )
+
+        self._depths: Dict[Node, int | None] = {}
+        shapes = {
+            *shacl_graph.subjects(RDF.type, SH.NodeShape),
+            *shacl_graph.subjects(RDF.type, SH.PropertyShape),
+            *shacl_graph.subjects(SH.path, None),
+        }
+        depths = [self._shape_depth(shape) for shape in shapes]
+        self.depth = None if None in depths else max(depths, default=0)
+
+    def _path_length(self, path: Node) -> int | None:
+        """Add the predicates of ``path`` and return its maximum length."""
+        graph = self._graph
+        if not isinstance(path, BNode):
+            self.forward.add(path)
+            return 1
+        if (path, RDF.first, None) in graph:
+            lengths = [self._path_length(step) for step in graph.items(path)]
+            return None if None in lengths else sum(lengths)
+        if (inverse_path := graph.value(path, SH.inversePath)) is not None:
+            forward, inverse = self.forward, self.inverse
+            self.forward, self.inverse = inverse, forward
+            try:
+                return self._path_length(inverse_path)
+            finally:
+                self.forward, self.inverse = forward, inverse
+        if (alternatives := graph.value(path, SH.alternativePath)) is not None:
+            lengths = [self._path_length(step) for step in graph.items(alternatives)]
+            return None if None in lengths else max(lengths, default=0)
+        if (optional_path := graph.value(path, SH.zeroOrOnePath)) is not None:
+            return self._path_length(optional_path)
+        for predicate in (SH.zeroOrMorePath, SH.oneOrMorePath):
+            if (repeated_path := graph.value(path, predicate)) is not None:
+                self._path_length(repeated_path)
+                return None
+        return 0
+
+    def _shape_depth(self, shape: Node) -> int | None:
+        """Return the number of steps ``shape`` and its nested shapes take."""
+        if shape in self._depths:
+            # A shape which is still being measured is part of a cycle.
+            return self._depths[shape]
+        self._depths[shape] = None
+        graph = self._graph
+        depth = 0
+        if (path := graph.value(shape, SH.path)) is not None:
+            depth = self._path_length(path)
+        nested = [
+            *(
+                nested_shape
+                for predicate in _NESTED_SHAPE_PREDICATES
+                for nested_shape in graph.objects(shape, predicate)
+            ),
+            *(
+                nested_shape
+                for predicate in _NESTED_SHAPE_LIST_PREDICATES
+                for shapes in graph.objects(shape, predicate)
+                for nested_shape in graph.items(shapes)
+            ),
+        ]
+        nested_depths = [self._shape_depth(nested_shape) for nested_shape in nested]
+        if depth is not None and None not in nested_depths:
+            depth += max(nested_depths, default=0)
+            self._depths[shape] = depth
+        else:
+            depth = None
+        return depth
+
+
+class IncrementalValidator:
+    """Validates successive versions of a data graph against ``shacl_graph``.
+
+    The first call of `validate` validates the data graph in full, later calls only
+    the focus nodes affected by the changes since the previous call. The outcome is the
+    same as that of `validate_graph`. ``inference``, ``schema``, ``js_runtime``,
+    ``min_severity``, and ``fail_fast`` are passed on to `validate_graph`.
+
+    With ``fail_fast``, a report with results may lack those of unaffected focus nodes.
+    If the results of the affected focus nodes are fixed later on, the data graph is
+    validated in full again.
+
+    Blank nodes are compared by identity, so a data graph which is parsed again (rather
+    than modified) changes all of its triples with blank nodes.
+    """
+
+    def __init__(
+        self,
+        shacl_graph: Graph,
+        inference: str = "rdfs",
+        schema: SchemaClosure | None = None,
+        js_runtime: JSRuntime | None = None,
+        min_severity: SeverityLevel = SeverityLevel.INFO,
+        fail_fast: bool = False,
+    ):
+        self.shacl_graph = shacl_graph
+        self.inference = inference
+        self.schema = schema
+        self.js_runtime = js_runtime
+        self.min_severity = min_severity
+        self.fail_fast = fail_fast
+        self._reach = _ShapeReach(shacl_graph)
+        # The classes entailed for the objects of a predicate.
+        self._ranges: Dict[Node, Iterable[Node]] = {}
+        if inference != "none" and schema is not None:
+            for prop, superproperties in schema._superproperties.items():
+                if any(p in self._reach.forward for p in superproperties):
+                    self._reach.forward.add(prop)
+                if any(p in self._reach.inverse for p in superproperties):
+                    self._reach.inverse.add(prop)
+            self._ranges.update(schema._ranges)
+        if inference == "rdfs":
+            self._ranges[RDF.type] = (RDFS.Class,)
+        self._data_graph: Graph | None = None
+        self._validation_graph: Graph | None = None
+        self._conforms = True
+        # Whether the validation graph holds all results, see `fail_fast`.
+        self._complete = True
+
+    def reset(self) -> None:
+        """Forget the previous validation, so that the next one is a full one."""
+        self._data_graph = self._validation_graph = None
+
+    def validate(self, data_graph: Graph) -> Tuple[bool, Graph]:
+        """Validate ``data_graph`` like `validate_graph` does.
+
+        The returned validation graph is updated in place by later validations, so it
+        must be copied to be kept. It must not be modified.
+        """
+        if self._data_graph is None:
+            return self._validate_fully(data_graph, reason="first validation")
+        if reason := self._full_validation_reason(data_graph):
+            return self._validate_fully(data_graph, reason)
+
+        with span("diff_data_graphs") as trace:
+            delta = GraphDelta.compute(self._data_graph, data_graph)
+            trace.set(added=len(delta.added), removed=len(delta.removed))
+        if not delta:
+            return self._conforms, self._validation_graph
+
+        with span("select_affected_nodes") as trace:
+            affected = self._affected_nodes(delta.nodes(), self._data_graph, data_graph)
+            subgraph = self._describe(affected, data_graph)
+            trace.set(focus_nodes=len(affected), subgraph_triples=len(subgraph))
+        if len(subgraph) >= len(data_graph):
+            return self._validate_fully(data_graph, reason="everything is affected")
+
+        _conforms, validation_graph = validate_graph(
+            subgraph,
+            self.shacl_graph,
+            inference=self.inference,
+            schema=self.schema,
+            js_runtime=self.js_runtime,
+            min_severity=self.min_severity,
+            fail_fast=self.fail_fast,
+        )
+        with span("merge_validation_graphs"):
+            self._conforms = _replace_results(
+                self._validation_graph, validation_graph, affected
+            )
+        if self._conforms and not self._complete:
+            return self._validate_fully(data_graph, reason="the report was incomplete")
+        self._complete = self._conforms or not self.fail_fast
+        for triple in delta.removed:
+            self._data_graph.remove(triple)
+        self._data_graph.addN((*triple, self._data_graph) for triple in delta.added)
+        return self._conforms, self._validation_graph
+
+    def _full_validation_reason(self, data_graph: Graph) -> str | None:
+        if not self._reach.is_local:
+            return "the shapes use SPARQL or JavaScript which isn't marked as pure"
+        if any(
+            (None, predicate, None) in graph
+            for graph in (self._data_graph, data_graph)
+            for predicate in _SCHEMA_PREDICATES
+        ):
+            return "the data graph contains schema triples"
+        return None
+
+    def _validate_fully(self, data_graph: Graph, reason: str) -> Tuple[bool, Graph]:
+        logger.debug("Validating the data graph in full: %s", reason)
+        self._conforms, self._validation_graph = validate_graph(
+            data_graph,
+            self.shacl_graph,
+            inference=self.inference,
+            schema=self.schema,
+            js_runtime=self.js_runtime,
+            min_severity=self.min_severity,
+            fail_fast=self.fail_fast,
+        )
+        self._complete = self._conforms or not self.fail_fast
+        self._data_graph = _copy_graph(data_graph)
+        return self._conforms, self._validation_graph
+
+    def _walk(
+        self, nodes: Iterable[Node], graphs: Iterable[Graph], backward: bool
+    ) -> Set[Node]:
+        """Return the nodes reached from ``nodes`` along the paths of the shapes.
+
+        If ``backward`` is true, the paths are followed in reverse, from the values to
+        the focus nodes.
+        """
+        forward, inverse = self._reach.forward, self._reach.inverse
+        if backward:
+            forward, inverse = inverse, forward
+        reached = set(nodes)
+        level = set(reached)
+        steps = 0
+        while level and (self._reach.depth is None or steps < self._reach.depth):
+            next_level = set()
+            for graph in graphs:
+                for node in level:
+                    if not isinstance(node, Literal):
+                        for predicate in forward:
+                            next_level.update(graph.objects(node, predicate))
+                    for predicate in inverse:
+                        next_level.update(graph.subjects(predicate, node))
+            level = next_level - reached
+            reached |= level
+            steps += 1
+        return reached
+
+    def _affected_nodes(
+        self, changed_nodes: Set[Node], old_graph: Graph, new_graph: Graph
+    ) -> Set[Node]:
+        """Return the focus nodes which can reach any of ``changed_nodes``."""
+        graphs = (old_graph, new_graph)
+        nodes = _blank_node_closure(changed_nodes, graphs, backward=True)
+        return self._walk(nodes, graphs, backward=True)
+
+    def _describe(self, focus_nodes: Set[Node], data_graph: Graph) -> Graph:
+        """Return the part of ``data_graph`` the shapes can see from ``focus_nodes``.
+
+        This includes the triples determining whether the nodes are targeted. Instead of
+        the incoming triples which entail the types of a node (by the range of their
+        predicate), the types themselves are included, as there may be many such
+        triples, e.g. the ``rdf:type`` triples of all instances of a class.
+        """
+        incoming = self._reach.inverse | self._reach.target_objects_of
+        ranges = {
+            predicate: classes
+            for predicate in data_graph.predicates(unique=True)
+            if (classes := self._ranges.get(predicate))
+        }
+        subgraph = Graph()
+        # The messages of results abbreviate IRIs using the prefixes of the data graph.
+        for prefix, iri in data_graph.namespaces():
+            subgraph.bind(prefix, iri)
+        nodes = self._walk(focus_nodes, (data_graph,), backward=False)
+        for node in _blank_node_closure(nodes, (data_graph,), backward=False):
+            if isinstance(node, Literal):
+                continue
+            subgraph += data_graph.triples((node, None, None))
+            for predicate in incoming:
+                subgraph += data_graph.triples((None, predicate, node))
+            for predicate, classes in ranges.items():
+                if (None, predicate, node) in data_graph:
+                    subgraph.addN(
+                        (node, RDF.type, class_, subgraph) for class_ in classes
+                    )
+        return subgraph
+
+
+def _blank_node_closure(
+    nodes: Iterable[Node], graphs: Iterable[Graph], backward: bool
+) -> Set[Node]:
+    """Add the blank nodes which ``nodes`` link to, or which link to them.
+
+    pyshacl describes blank nodes in full in the messages of results, so a result
+    depends on all blank nodes its focus node and value link to. If ``backward`` is
+    true, the nodes linking to the blank nodes among ``nodes`` are added instead.
+    """
+    reached = set(nodes)
+    queue = list(reached)
+    while queue:
+        node = queue.pop()
+        for graph in graphs:
+            if backward and isinstance(node, BNode):
+                linked = graph.subjects(None, node)
+            elif not backward and not isinstance(node, Literal):
+                linked = (o for o in graph.objects(node) if isinstance(o, BNode))
+            else:
+                continue
+            for linked_node in linked:
+                if linked_node not in reached:
+                    reached.add(linked_node)
+                    queue.append(linked_node)
+    return reached
+
+
+def _copy_graph(graph: Graph) -> Graph:
+    copy = Graph()
+    copy += graph
+    return copy
+
+
+def _add_closure(target: Graph, source: Graph, node: Node) -> None:
+    """Copy the triples of ``node`` and of the blank nodes it links to."""
+    queue = [node]
+    seen = {node}
+    while queue:
+        for triple in source.triples((queue.pop(), None, None)):
+            target.add(triple)
+            if isinstance(obj := triple[2], BNode) and obj not in seen:
+                seen.add(obj)
+                queue.append(obj)
+
+
+def _replace_results(
+    validation_graph: Graph, new_validation_graph: Graph, focus_nodes: Set[Node]
+) -> bool:
+    """Replace the results for ``focus_nodes`` by those of ``new_validation_graph``.
+
+    ``validation_graph`` is updated in place. Results of ``new_validation_graph`` for
+    other focus nodes are dropped, as they were validated on a part of the data graph
+    only. Returns whether the updated report conforms.
+    """
+    report = validation_graph.value(None, RDF.type, SH.ValidationReport)
+    for focus_node in focus_nodes:
+        for result in list(validation_graph.subjects(SH.focusNode, focus_node)):
+            if (report, SH.result, result) in validation_graph:
+                validation_graph.remove((report, SH.result, result))
+                remove_closure(validation_graph, result)
+    for result in new_validation_graph.objects(None, SH.result):
+        if new_validation_graph.value(result, SH.focusNode) in focus_nodes:
+            validation_graph.add((report, SH.result, result))
+            _add_closure(validation_graph, new_validation_graph, result)
+    conforms = (report, SH.result, None) not in validation_graph
+    validation_graph.set((report, SH.conforms, Literal(conforms)))
+    return conforms
@@ -0,0 +1,380 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+"""A reusable runtime for SHACL-JS constraints, targets, rules, and functions.
+
+pyshacl creates a new JavaScript context and loads the ``sh:jsLibrary`` scripts again
+for every execution, i.e. for every focus node and value. While a `JSRuntime` is active
+(see `JSRuntime.activate`), executions use warm contexts instead, which already hold
+the compiled scripts::
+
+    runtime = JSRuntime()
+    with runtime.activate():
+        validate(data_graph, shacl_graph=shacl_graph, js=True)
+
+The results of validators and functions which are marked as pure using
+``scimpl:memoize true`` are memoized per value::
+
+    scimpl:orcidChecksumMatches a sh:JSValidator ;
+        scimpl:memoize true ;
+        ...
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any, Dict, Iterator, Tuple
+
+from rdflib import Graph, Literal, Node
+
+from software_card_policies.fetch import Fetcher
+from software_card_policies.namespaces import SCIMPL
+
+logger = logging.getLogger(__name__)
+
+# The versions of pyshacl whose internals `JSRuntime` has been checked against, see
+# `_install`. Other versions use pyshacl's own execution of SHACL-JS.
+_PYSHACL_VERSIONS = ((0, 30), (0, 41))
+
+# Modes of `JSExecutable.execute` whose results only depend on the arguments, if the
+# executable is pure. Targets and rules depend on the data graph as a whole.
+_MEMOIZABLE_MODES = (None, "function")
+
+# Results which are immutable, so that they can be shared between executions.
+_MEMOIZABLE_RESULTS = (bool, int, float, str, Node, type(None))
+
+
+class JSLibraryError(Exception):
+    """Raised if the script of a ``sh:jsLibraryURL`` can't be read."""
+
+
+@dataclass
+class _Library:
+    """The script of a ``sh:jsLibraryURL`` and the functions it defines."""
+
+    url: str
+    script: bytes
+    digest: str
+    #: Parameter names per function name, as extracted by pyshacl
+    functions: Dict[str, Tuple[str, ...]]
+    loaded_at: float
+
+
+@dataclass
+class _Context:
+    """A JavaScript context with a set of libraries loaded into it."""
+
+    js_context: Any
+    #: Parameter names per function name of all loaded libraries
+    functions: Dict[str, Tuple[str, ...]]
+    executions: int = 0
+    data_graph: Graph | None = None
+    shapes_graph: Graph | None = None
+
+
+@dataclass
+class _ThreadState:
+    #: Contexts by whether they are used for SHACL functions and by their libraries,
+    #: least recently used first
+    contexts: "OrderedDict[tuple, _Context]" = field(default_factory=OrderedDict)
+
+
+_active_runtime: ContextVar["JSRuntime | None"] = ContextVar(
+    "active_runtime", default=None
+)
+
+
+class JSRuntime:
+    """Warm JavaScript contexts for SHACL-JS, for use with pyshacl.
+
+    Every thread gets contexts of its own, one per combination of libraries, so that a
+    runtime can be shared between threads. Libraries are read using ``fetcher`` and are
+    identified by their URL and the hash of their contents. They are read again once
+    they are older than ``library_max_age`` seconds, so that changed scripts are picked
+    up by long-running processes. A context is replaced by a new one after
+    ``max_executions`` executions to limit the growth of its heap, and at most
+    ``max_contexts`` contexts are kept per thread.
+
+    If ``memoize`` is true, the results of executables marked with ``scimpl:memoize``
+    are memoized, keeping at most ``max_memoized_results`` results.
+    """
+
+    def __init__(
+        self,
+        fetcher: Fetcher | None = None,
+        memoize: bool = True,
+        library_max_age: float = 60,
+        max_executions: int = 10_000,
+        max_contexts: int = 16,
+        max_memoized_results: int = 10_000,
+    ):
+        self.fetcher = fetcher or Fetcher()
+        self.memoize = memoize
+        self.library_max_age = library_max_age
+        self.max_executions = max_executions
+        self.max_contexts = max_contexts
+        self.max_memoized_results = max_memoized_results
+        self._libraries: Dict[str, _Library] = {}
+        self._memoized: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def activate(self) -> Iterator["JSRuntime"]:
+        """Use this runtime for the SHACL-JS executions of pyshacl within the block.
+
+        On exit, the contexts of the current thread release the graphs they were
+        used with.
+        """
+        _install()
+        token = _active_runtime.set(self)
+        try:
+            yield self
+        finally:
+            _active_runtime.reset(token)
+            for context in self._thread_state().contexts.values():
+                _bind_graphs(context, None, None)
+
+    def clear(self) -> None:
+        """Drop the libraries and memoized results, e.g. after scripts have changed."""
+        with self._lock:
+            self._libraries.clear()
+            self._memoized.clear()
+        self._local = threading.local()
+
+    def library_digest(self, url: str) -> str:
+        """Return the hash of the ``sh:jsLibraryURL`` script which the runtime uses.
+
+        Raises a `JSLibraryError` if the script can't be read.
+        """
+        return self._library(url).digest
+
+    def _thread_state(self) -> _ThreadState:
+        if not hasattr(self._local, "state"):
+            self._local.state = _ThreadState()
+        return self._local.state
+
+    def _library(self, url: str) -> _Library:
+        with self._lock:
+            library = self._libraries.get(url)
+        if (
+            library is None
+            or time.monotonic() - library.loaded_at > self.library_max_age
+        ):
+            from pyshacl.extras.js.loader import extract_functions
+
+            try:
+                script = self.fetcher.fetch(url)
+            except OSError as e:
+                raise JSLibraryError(
+                    f"JavaScript library '{url}' could not be read: {e}"
+                ) from e
+            digest = hashlib.sha256(script).hexdigest()
+            if library is None or library.digest != digest:
+                library = _Library(url, script, digest, extract_functions(script), 0)
+            library.loaded_at = time.monotonic()
+            with self._lock:
+                self._libraries[url] = library
+        return library
+
+    def _context(
+        self, libraries: Tuple[_Library, ...], function_mode: bool
+    ) -> _Context:
+        contexts = self._thread_state().contexts
+        key = (function_mode, *((library.url, library.digest) for library in libraries))
+        context = contexts.get(key)
+        if context is not None and context.executions < self.max_executions:
+            contexts.move_to_end(key)
+            return context
+
+        from pyshacl.extras.js.context import SHACLJSContext
+
+        # The graphs are bound on every execution, see `_bind_graphs`.
+        shacl_js_context = SHACLJSContext(Graph(), shapes_graph=None)
+        functions = {}
+        for library in libraries:
+            shacl_js_context.context.eval_js(library.script)
+            functions.update(library.functions)
+        shacl_js_context.fns = functions
+        context = contexts[key] = _Context(shacl_js_context, functions)
+        contexts.move_to_end(key)
+        while len(contexts) > self.max_contexts:
+            contexts.popitem(last=False)
+        return context
+
+    def execute(
+        self,
+        executable,
+        data_graph: Graph,
+        args_map: Dict[str, Any],
+        mode: str | None = None,
+        return_type: Node | None = None,
+    ) -> Dict[str, Any]:
+        """Run a pyshacl ``JSExecutable`` like ``JSExecutable.execute`` does."""
+        libraries = tuple(
+            self._library(url) for urls in executable.libraries.values() for url in urls
+        )
+        context = self._context(libraries, function_mode=mode == "function")
+
+        memo_key = None
+        if (
+            self.memoize
+            and mode in _MEMOIZABLE_MODES
+            and (executable.node, SCIMPL.memoize, Literal(True)) in executable.sg.graph
+        ):
+            parameters = context.functions.get(executable.fn_name, ())
+            arguments = tuple(
+                args_map.get(parameter.removeprefix("$")) for parameter in parameters
+            )
+            memo_key = (
+                *((library.url, library.digest) for library in libraries),
+                executable.fn_name,
+                mode,
+                return_type,
+                arguments,
+            )
+            try:
+                with self._lock:
+                    if memo_key in self._memoized:
+                        self._memoized.move_to_end(memo_key)
+                        return {"_result": self._memoized[memo_key]}
+            except TypeError:
+                # Unhashable arguments, such as lists, are not memoized.
+                memo_key = None
+
+        # Unlike pyshacl, bind the RDF graph rather than its wrapper, which can't be
+        # searched from JavaScript.
+        shapes_graph = None if mode == "function" else executable.sg.graph
+        _bind_graphs(context, data_graph, shapes_graph)
+        shacl_js_context = context.js_context
+        context.executions += 1
+        fn_args = shacl_js_context.get_fn_args(executable.fn_name, args_map)
+        rvals = shacl_js_context.run_js_function(executable.fn_name, fn_args)
+        result = rvals["_result"]
+        if mode == "function":
+            result = shacl_js_context.build_results_as_shacl_function(
+                result, return_type
+            )
+        elif mode == "construct":
+            result = shacl_js_context.build_results_as_construct(result)
+        elif mode == "target":
+            result = shacl_js_context.build_results_as_target(result)
+        else:
+            result = shacl_js_context.build_results_as_constraint(result)
+        rvals["_result"] = result
+
+        if memo_key is not None and isinstance(result, _MEMOIZABLE_RESULTS):
+            with self._lock:
+                self._memoized[memo_key] = result
+                while len(self._memoized) > self.max_memoized_results:
+                    self._memoized.popitem(last=False)
+        return rvals
+
+
+def _bind_graphs(context: _Context, data_graph: Graph | None, shapes_graph) -> None:
+    """Bind ``$data`` and ``$shapes`` of a context, unless they are bound already."""
+    from pyshacl.extras.js.context import GraphNativeWrapper
+
+    js_context = context.js_context.context
+    if context.data_graph is not data_graph:
+        native_graph = None if data_graph is None else GraphNativeWrapper(data_graph)
+        js_context.set_globals(_native_data_graph=native_graph)
+        js_context.eval_js(
+            "var $data = "
+            "_native_data_graph ? new Graph(_native_data_graph) : undefined;"
+        )
+        context.data_graph = data_graph
+    if context.shapes_graph is not shapes_graph:
+        native_graph = (
+            None if shapes_graph is None else GraphNativeWrapper(shapes_graph)
+        )
+        js_context.set_globals(_native_shapes_graph=native_graph)
+        js_context.eval_js(
+            "var $shapes = "
+            "_native_shapes_graph ? new Graph(_native_shapes_graph) : undefined;"
+        )
+        context.shapes_graph = shapes_graph
+
+
+@cache
+def _supports_pyshacl() -> bool:
+    """Check whether the installed pyshacl has the internals used by `JSRuntime`."""
+    import pyshacl
+    from pyshacl.extras.js import context, loader
+
+    try:
+        version = tuple(int(part) for part in pyshacl.__version__.split(".")[:2])
+    except ValueError:
+        version = None
+    if version is None or not _PYSHACL_VERSIONS[0] <= version < _PYSHACL_VERSIONS[1]:
+        reason = f"pyshacl {pyshacl.__version__} is not supported"
+    elif not (
+        hasattr(loader, "extract_functions")
+        and hasattr(context, "GraphNativeWrapper")
+        and all(
+            hasattr(context.SHACLJSContext, name)
+            for name in (
+                "get_fn_args",
+                "run_js_function",
+                "build_results_as_constraint",
+                "build_results_as_construct",
+                "build_results_as_target",
+                "build_results_as_shacl_function",
+            )
+        )
+    ):
+        reason = f"the SHACL-JS internals of pyshacl {pyshacl.__version__} differ"
+    else:
+        return True
+    logger.warning("Not reusing JavaScript contexts, as %s", reason)
+    return False
+
+
+def _install() -> None:
+    """Route the executions of pyshacl's ``JSExecutable`` through the active runtime.
+
+    If pyshacl isn't supported (see `_supports_pyshacl`), SHACL-JS code is run in new
+    contexts, as usual.
+    """
+    from pyshacl.extras.js.js_executable import JSExecutable
+
+    if getattr(JSExecutable.execute, "uses_js_runtime", False):
+        return
+    if not _supports_pyshacl():
+        return
+    execute_in_new_context = JSExecutable.execute
+
+    def execute(self, data_graph, args_map, *args, mode=None, return_type=None, **kw):
+        runtime = _active_runtime.get()
+        if runtime is None or args or kw:
+            return execute_in_new_context(
+                self,
+                data_graph,
+                args_map,
+                *args,
+                mode=mode,
+                return_type=return_type,
+                **kw,
+            )
+        return runtime.execute(self, data_graph, args_map, mode, return_type)
+
+    execute.uses_js_runtime = True
+    JSExecutable.execute = execute
+
+
+@cache
+def default_runtime() -> JSRuntime:
+    """Return the runtime shared by the validations of this process.
+
+    It is used by validations which aren't given a runtime of their own. Its libraries
+    are read by a `Fetcher` without a cache, so applications with a cache or an offline
+    mode should pass a `JSRuntime` using their own fetcher instead.
+    """
+    return JSRuntime()
@@ -19,6 +19,7 @@ class SC(DefinedNamespace):
     Scalar: URIRef
 
     #: The "outer type" of a parameter. May be `rdf:List/Seq/Bag/Alt` or `sc:Scalar`.
+    #: This implementation also supports `scimpl:Set`.
     parameterOuterType: URIRef
     #: The "inner type" of a parameter. May be `rdfs:Resource` to refer to a complex
     #: type. Or, may be one of the following primitive data types:
@@ -35,6 +36,26 @@ class SCIMPL(DefinedNamespace):
         "https://schema.software-metadata.pub/software-card/2025-01/implementation/#"
     )
 
+    #: The name under which the policy that produced a `sh:ValidationResult` is
+    #: configured
+    policyConfigName: URIRef
+    #: Marks a SHACL-JS or SPARQL validator or function as pure, so that its results
+    #: may be memoized per value (see `software_card_policies.javascript`) and it is
+    #: only run again for changed values (see `software_card_policies.incremental`)
+    memoize: URIRef
+    #: Represents the notion that a `sc:Parameter` is a stand-in for a (possibly large)
+    #: set of values, to be checked using `scimpl:inSet`
+    Set: URIRef
+    #: Constraint parameter which checks that the value nodes are members of a
+    #: `scimpl:Set` parameter (see `software_card_policies.enumerations`)
+    inSet: URIRef
+    #: The constraint component of `scimpl:inSet`
+    InSetConstraintComponent: URIRef
+    #: The members of a set, as a literal holding one N-Triples term per line
+    setMembers: URIRef
+    #: SPARQL function which checks whether a value is a member of a set
+    setContains: URIRef
+
 
 class SCEX(DefinedNamespace):
     """Software CaRD example components."""
@@ -0,0 +1,137 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+
+from rdflib import Graph
+
+from software_card_policies.data_model import (
+    SchemaClosure,
+    SeverityLevel,
+    mark_shacl_graph_verified,
+    merge_validation_graphs,
+    read_rdf_resource,
+    validate_graph,
+)
+from software_card_policies.fetch import Fetcher
+from software_card_policies.javascript import JSRuntime
+from software_card_policies.tracing import span
+
+# The shapes graphs of the current worker process, keyed by policy name, the validation
+# settings, and the JavaScript runtime.
+_worker_shapes_graphs: Dict[str, Graph] = {}
+_worker_inference = "rdfs"
+_worker_schema: SchemaClosure | None = None
+_worker_min_severity = SeverityLevel.INFO
+_worker_fail_fast = False
+_worker_js_runtime: JSRuntime | None = None
+
+
+def _init_worker(
+    shapes_data: Dict[str, bytes],
+    inference: str,
+    schema_data: bytes | None,
+    min_severity: SeverityLevel,
+    fail_fast: bool,
+    fetcher: Fetcher | None,
+) -> None:
+    global _worker_inference, _worker_schema, _worker_min_severity, _worker_fail_fast
+    global _worker_js_runtime
+    for name, data in shapes_data.items():
+        shapes_graph = read_rdf_resource(format="nt", data=data)
+        mark_shacl_graph_verified(shapes_graph)
+        _worker_shapes_graphs[name] = shapes_graph
+    _worker_inference = inference
+    _worker_schema = SchemaClosure.load(schema_data) if schema_data else None
+    _worker_min_severity, _worker_fail_fast = min_severity, fail_fast
+    _worker_js_runtime = JSRuntime(fetcher) if fetcher is not None else None
+
+
+def _validate_policy(name: str, data: bytes) -> Tuple[bool, bytes, float]:
+    start = time.perf_counter()
+    data_graph = read_rdf_resource(format="nt", data=data)
+    conforms, validation_graph = validate_graph(
+        data_graph,
+        _worker_shapes_graphs[name],
+        inference=_worker_inference,
+        schema=_worker_schema,
+        js_runtime=_worker_js_runtime,
+        min_severity=_worker_min_severity,
+        fail_fast=_worker_fail_fast,
+    )
+    validation_data = validation_graph.serialize(format="nt", encoding="utf-8")
+    return conforms, validation_data, time.perf_counter() - start
+
+
+class PolicyPool:
+    """Validates data graphs against every policy of a config concurrently.
+
+    Each worker process holds the shapes graphs of all policies as created by
+    `make_shacl_graphs`. A data graph is validated against each policy separately and
+    the results are combined using `merge_validation_graphs`, so that a slow policy
+    doesn't hold up the others. ``inference``, ``schema``, ``min_severity``, and
+    ``fail_fast`` are passed on to `validate_graph`. The scripts of SHACL-JS libraries
+    are read using ``fetcher``.
+    """
+
+    def __init__(
+        self,
+        shacl_graphs: Dict[str, Graph],
+        jobs: int | None = None,
+        inference: str = "rdfs",
+        schema: SchemaClosure | None = None,
+        min_severity: SeverityLevel = SeverityLevel.INFO,
+        fail_fast: bool = False,
+        fetcher: Fetcher | None = None,
+    ):
+        shapes_data = {
+            name: shacl_graph.serialize(format="nt", encoding="utf-8")
+            for name, shacl_graph in shacl_graphs.items()
+        }
+        schema_data = schema.dump() if schema is not None else None
+        self._executor = ProcessPoolExecutor(
+            max_workers=jobs or len(shacl_graphs) or None,
+            initializer=_init_worker,
+            initargs=(
+                shapes_data,
+                inference,
+                schema_data,
+                min_severity,
+                fail_fast,
+                fetcher,
+            ),
+        )
+        self.policy_names = list(shacl_graphs)
+
+    def validate(self, data_graph: Graph) -> Tuple[bool, Graph]:
+        with span("validate_policies", policies=len(self.policy_names)) as trace:
+            data = data_graph.serialize(format="nt", encoding="utf-8")
+            futures = {
+                name: self._executor.submit(_validate_policy, name, data)
+                for name in self.policy_names
+            }
+            validation_graphs = {}
+            conforms = True
+            # Seconds spent in the worker processes, per policy
+            policy_seconds = {}
+            for name, future in futures.items():
+                policy_conforms, validation_data, seconds = future.result()
+                conforms = conforms and policy_conforms
+                policy_seconds[name] = seconds
+                validation_graphs[name] = read_rdf_resource(
+                    format="nt", data=validation_data
+                )
+            trace.set(policy_seconds=policy_seconds)
+            return conforms, merge_validation_graphs(validation_graphs)
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_info):
+        self.close()
@@ -2,10 +2,28 @@
 # SPDX-License-Identifier: Apache-2.0
 # SPDX-FileContributor: David Pape
 
-from rdflib import Graph, Literal, Node
+import hashlib
+from typing import Any, Dict, List, Tuple
+
+from rdflib import BNode, Graph, Literal, Node
+from rdflib.collection import Collection
+from rdflib.namespace import RDF, SH
 from rdflib.term import URIRef
 
 
+def select_language(values_by_language: Dict[str | None, Any], language=None) -> Any:
+    """Pick the value of a given language, falling back to English or German."""
+    if not values_by_language:
+        return None
+
+    return (
+        values_by_language.get(language)
+        or values_by_language.get("en")
+        or values_by_language.get("de")
+        or next(iter(values_by_language.values()))
+    )
+
+
 def get_language_tagged_literal(
     graph: Graph, subject: Node, predicate: URIRef, language=None
 ) -> Literal:
@@ -15,12 +33,153 @@ def get_language_tagged_literal(
         assert isinstance(obj, Literal)
         literals_by_language[obj.language] = obj.value
 
-    if not literals_by_language:
+    return select_language(literals_by_language, language)
+
+
+def format_node(node: Node | None) -> str | None:
+    """Format a node as a plain string: IRIs as is, blank nodes as ``_:id``."""
+    if node is None:
         return None
+    if isinstance(node, URIRef):
+        return str(node)
+    return node.n3()
 
-    return (
-        literals_by_language.get(language)
-        or literals_by_language.get("en")
-        or literals_by_language.get("de")
-        or next(iter(literals_by_language.values()))
+
+def ntriples_term(node: Node) -> str:
+    """Format a node as an N-Triples term."""
+    if not isinstance(node, Literal):
+        return node.n3()
+    # Unlike `Literal.n3`, never use long (triple-quoted) strings.
+    lexical = (
+        str(node)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+    if node.language:
+        return f'"{lexical}"@{node.language}'
+    if node.datatype:
+        return f'"{lexical}"^^<{node.datatype}>'
+    return f'"{lexical}"'
+
+
+def format_shacl_path(graph: Graph, path: Node | None) -> str | None:
+    """Format a SHACL property path.
+
+    A path which is a single predicate is formatted as its IRI. More complex paths are
+    formatted using SPARQL property path syntax.
+    """
+    if path is None or isinstance(path, URIRef):
+        return format_node(path)
+    return _format_path_expression(graph, path)
+
+
+def _format_path_expression(graph: Graph, path: Node) -> str:
+    if isinstance(path, URIRef):
+        return path.n3()
+    if graph.value(path, RDF.first) is not None:
+        steps = [_format_path_expression(graph, p) for p in Collection(graph, path)]
+        return f"({'/'.join(steps)})"
+    if (inner := graph.value(path, SH.inversePath)) is not None:
+        return f"^{_format_path_expression(graph, inner)}"
+    if (alternatives := graph.value(path, SH.alternativePath)) is not None:
+        options = [
+            _format_path_expression(graph, p) for p in Collection(graph, alternatives)
+        ]
+        return f"({'|'.join(options)})"
+    for predicate, operator in (
+        (SH.zeroOrMorePath, "*"),
+        (SH.oneOrMorePath, "+"),
+        (SH.zeroOrOnePath, "?"),
+    ):
+        if (inner := graph.value(path, predicate)) is not None:
+            return f"{_format_path_expression(graph, inner)}{operator}"
+    return path.n3()
+
+
+def remove_closure(graph: Graph, node: Node) -> None:
+    """Remove the triples of ``node`` and of the blank nodes only it links to."""
+    queue = [node]
+    while queue:
+        subject = queue.pop()
+        objects = list(graph.objects(subject))
+        graph.remove((subject, None, None))
+        for obj in objects:
+            # Blank nodes such as the copies of shapes are shared between
+            # validation results.
+            if isinstance(obj, BNode) and (None, None, obj) not in graph:
+                queue.append(obj)
+
+
+def _has_blank_node_cycle(edges: List[Tuple[BNode, BNode]]) -> bool:
+    """Check whether triples linking blank nodes to blank nodes form a cycle."""
+    parents: Dict[BNode, BNode] = {}
+
+    def root(node: BNode) -> BNode:
+        while (parent := parents.get(node, node)) != node:
+            parents[node] = parents.get(parent, parent)
+            node = parent
+        return node
+
+    for subject, obj in edges:
+        subject_root, object_root = root(subject), root(obj)
+        if subject_root == object_root:
+            return True
+        parents[subject_root] = object_root
+    return False
+
+
+def graph_hash(graph: Graph) -> str:
+    """Return a hash of ``graph`` which doesn't depend on the labels of blank nodes.
+
+    Isomorphic graphs have the same hash. Blank nodes are labeled by their
+    neighborhoods using color refinement, which tells apart all graphs whose blank
+    nodes form trees, as in typical metadata. Other graphs are labeled canonically
+    using `rdflib.compare`, which is exact but much slower.
+    """
+    triples = list(graph.triples((None, None, None)))
+    neighbors: Dict[BNode, List[Tuple[str, str, Node]]] = {}
+    edges = []
+    for subject, predicate, obj in triples:
+        if isinstance(subject, BNode):
+            neighbors.setdefault(subject, []).append(("out", predicate.n3(), obj))
+        if isinstance(obj, BNode):
+            neighbors.setdefault(obj, []).append(("in", predicate.n3(), subject))
+            if isinstance(subject, BNode):
+                edges.append((subject, obj))
+
+    if _has_blank_node_cycle(edges):
+        from rdflib.compare import to_canonical_graph
+
+        triples = list(to_canonical_graph(graph).triples((None, None, None)))
+        labels: Dict[Node, str] = {}
+    else:
+        labels = dict.fromkeys(neighbors, "")
+        classes = 1
+        while True:
+            labels = {
+                node: hashlib.sha256(
+                    "\n".join(
+                        [
+                            labels[node],
+                            *sorted(
+                                f"{direction} {predicate} "
+                                + (labels[other] if other in labels else other.n3())
+                                for direction, predicate, other in node_neighbors
+                            ),
+                        ]
+                    ).encode("utf-8")
+                ).hexdigest()
+                for node, node_neighbors in neighbors.items()
+            }
+            # Stop once the blank nodes aren't split into more classes anymore.
+            if len(set(labels.values())) == classes:
+                break
+            classes = len(set(labels.values()))
+
+    lines = sorted(
+        " ".join(labels[term] if term in labels else term.n3() for term in triple)
+        for triple in triples
     )
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
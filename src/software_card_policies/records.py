@@ -0,0 +1,229 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+"""Splitting of large metadata dumps into records which can be validated one by one.
+
+A record is a node of one of the record classes (``schema:SoftwareSourceCode`` by
+default) together with its bounded description: its own triples and those of the nodes
+it links to, such as its authors and their affiliations. Blank nodes are always
+followed, other nodes only up to a maximum depth. Other records are never followed, and
+triples which don't belong to any record are ignored.
+
+N-Triples are read line by line into an index on disk, so that the memory used doesn't
+grow with the size of the dump. Other formats are parsed into memory once and then
+indexed in the same way.
+"""
+
+import re
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple
+
+from rdflib import Graph
+from rdflib.namespace import RDF
+from rdflib.namespace import SDO as SCHEMA
+from rdflib.plugins.stores.memory import Memory
+from rdflib.util import guess_format
+
+from software_card_policies.fetch import is_url
+from software_card_policies.rdf_helpers import ntriples_term
+from software_card_policies.tracing import span
+
+#: Classes whose instances are validated as separate records by default
+RECORD_CLASSES = (SCHEMA.SoftwareSourceCode,)
+
+#: How many links are followed from a record to nodes which aren't blank nodes
+DEFAULT_MAX_DEPTH = 2
+
+_RDF_TYPE = RDF.type.n3()
+
+# Triples are inserted into the index in batches of this size.
+_BATCH_SIZE = 10_000
+
+# An N-Triples line: the subject, predicate and object terms, the final dot and an
+# optional comment. Terms don't need to be separated by whitespace, e.g. ``<s><p><o>.``.
+_NTRIPLES_LINE = re.compile(
+    r"""(<[^>]*>|_:[^\s<]+)\s*(<[^>]*>)\s*"""
+    r"""(<[^>]*>|_:\S*?|"(?:[^"\\]|\\.)*"(?:\^\^<[^>]*>|@[A-Za-z0-9-]+)?)"""
+    r"\s*\.\s*(?:#.*)?"
+)
+
+
+def _split_ntriples_line(line: str) -> Tuple[str, str, str] | None:
+    """Split an N-Triples line into its subject, predicate and object terms.
+
+    The object keeps its datatype or language tag. Returns ``None`` for empty lines and
+    comments.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if (match := _NTRIPLES_LINE.fullmatch(line)) is None:
+        raise ValueError(f"Invalid N-Triples line: {line}")
+    return match.group(1, 2, 3)
+
+
+def _ntriples_lines(path: Path) -> Iterator[Tuple[str, str, str, str]]:
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if (terms := _split_ntriples_line(line)) is not None:
+                # Lines are written again, as rdflib's parser requires whitespace
+                # between the terms.
+                yield (*terms, " ".join(terms) + " .")
+
+
+class _OrderedMemory(Memory):
+    """A memory store which remembers the order in which triples were added.
+
+    Graphs are iterated in an arbitrary order, which changes from run to run.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.added = []
+
+    def add(self, triple, context, quoted=False):
+        self.added.append(triple)
+        super().add(triple, context, quoted)
+
+
+def _parsed_lines(
+    source: Path | str, format: str
+) -> Iterator[Tuple[str, str, str, str]]:
+    store = _OrderedMemory()
+    Graph(store=store).parse(source, format=format)
+    # Triples which were added more than once are only kept the first time.
+    for subject, predicate, obj in dict.fromkeys(store.added):
+        terms = (subject.n3(), predicate.n3(), ntriples_term(obj))
+        yield (*terms, " ".join(terms) + " .")
+
+
+class RecordIndex:
+    """An index of the triples of a dump on disk, by subject.
+
+    Use `RecordIndex.build` to create one, and `records` to iterate over the records.
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    @classmethod
+    def build(
+        cls,
+        lines: Iterable[Tuple[str, str, str, str]],
+        directory: Path,
+        record_classes: Iterable[str] = RECORD_CLASSES,
+    ) -> "RecordIndex":
+        """Index triples given as their N-Triples terms and line in ``directory``."""
+        record_types = {str(record_class) for record_class in record_classes}
+        record_terms = {f"<{record_class}>" for record_class in record_types}
+        connection = sqlite3.connect(directory / "records.sqlite")
+        connection.executescript(
+            """
+            CREATE TABLE triples (subject TEXT, object TEXT, line TEXT);
+            CREATE TABLE records (id INTEGER PRIMARY KEY, subject TEXT UNIQUE);
+            """
+        )
+        batch, records = [], []
+        for subject, predicate, obj, line in lines:
+            # Literals are never followed.
+            batch.append((subject, obj if obj[0] in "<_" else None, line))
+            if predicate == _RDF_TYPE and obj in record_terms:
+                records.append((subject,))
+            if len(batch) >= _BATCH_SIZE:
+                connection.executemany("INSERT INTO triples VALUES (?, ?, ?)", batch)
+                connection.executemany(
+                    "INSERT OR IGNORE INTO records (subject) VALUES (?)", records
+                )
+                batch, records = [], []
+        connection.executemany("INSERT INTO triples VALUES (?, ?, ?)", batch)
+        connection.executemany(
+            "INSERT OR IGNORE INTO records (subject) VALUES (?)", records
+        )
+        connection.execute("CREATE INDEX triples_subject ON triples (subject)")
+        connection.commit()
+        return cls(connection)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def _is_record(self, term: str) -> bool:
+        query = "SELECT 1 FROM records WHERE subject = ?"
+        return self._connection.execute(query, (term,)).fetchone() is not None
+
+    def describe(self, record: str, max_depth: int = DEFAULT_MAX_DEPTH) -> bytes:
+        """Return the bounded description of ``record`` as N-Triples."""
+        lines = []
+        visited = {record}
+        level = [record]
+        depth = 0
+        while level:
+            next_level = []
+            for subject in level:
+                query = "SELECT object, line FROM triples WHERE subject = ?"
+                for obj, line in self._connection.execute(query, (subject,)):
+                    lines.append(line)
+                    if obj is None or obj in visited:
+                        continue
+                    is_blank = obj.startswith("_:")
+                    if (is_blank or depth < max_depth) and not self._is_record(obj):
+                        visited.add(obj)
+                        next_level.append(obj)
+            level = next_level
+            depth += 1
+        return "\n".join(lines).encode("utf-8") + b"\n"
+
+    def records(
+        self, max_depth: int = DEFAULT_MAX_DEPTH, source: Path | str | None = None
+    ) -> Iterator[Tuple[str, bytes]]:
+        """Yield the records of the dump with their bounded descriptions.
+
+        Records are yielded in the order of the dump, as pairs of their name and their
+        description. Records are named by their IRI. The labels of blank nodes change
+        whenever a dump is parsed, so blank nodes are named by their position in the
+        dump ``source`` instead, e.g. ``dump.ttl#record-3``.
+        """
+        prefix = f"{source}#record-" if source is not None else "record-"
+        # Read the records in pages, so that they are not all held in memory.
+        last_id = 0
+        while True:
+            page = self._connection.execute(
+                "SELECT id, subject FROM records WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, _BATCH_SIZE),
+            ).fetchall()
+            if not page:
+                return
+            for record_id, record in page:
+                is_iri = record.startswith("<")
+                name = record[1:-1] if is_iri else f"{prefix}{record_id}"
+                yield name, self.describe(record, max_depth)
+            last_id = page[-1][0]
+
+
+def split_records(
+    source: Path | str,
+    record_classes: Iterable[str] = RECORD_CLASSES,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+) -> Iterator[Tuple[str, bytes]]:
+    """Split a metadata dump into its records (see `RecordIndex.records`).
+
+    Local N-Triples files are streamed. Other formats and remote dumps are parsed into
+    memory once.
+    """
+    format = guess_format(str(source)) or "turtle"
+    if format == "nt" and not is_url(source):
+        lines = _ntriples_lines(Path(source))
+    else:
+        lines = _parsed_lines(source, format)
+    with tempfile.TemporaryDirectory() as directory:
+        with span("index_records", source=str(source), format=format) as trace:
+            index = RecordIndex.build(lines, Path(directory), record_classes)
+            trace.set(records=len(index))
+        with closing(index):
+            yield from index.records(max_depth, source)
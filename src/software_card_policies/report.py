@@ -2,26 +2,347 @@
 # SPDX-License-Identifier: Apache-2.0
 # SPDX-FileContributor: David Pape
 
-from rdflib import Graph
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, TextIO
+from urllib.parse import quote
+
+from rdflib import Graph, Literal
 from rdflib.namespace import RDF, SH
 
-from software_card_policies.data_model import ValidationReport
+from software_card_policies import __version__
+from software_card_policies.data_model import ValidationReport, ValidationResult
+from software_card_policies.fetch import is_url
 
+#: Output formats supported by `make_report_writer`
+REPORT_FORMATS = ("text", "jsonl", "sarif")
 
-def create_report(validation_graph: Graph, debug=False) -> str:
+
+def read_validation_report(validation_graph: Graph) -> ValidationReport:
+    """Extract the ``sh:ValidationReport`` from a validation graph."""
+    shacl_report, *_ = validation_graph.subjects(RDF.type, SH.ValidationReport)
+    return ValidationReport.from_graph(shacl_report, validation_graph)
+
+
+def read_validation_conforms(validation_graph: Graph) -> bool:
+    """Check whether the ``sh:ValidationReport`` of a validation graph conforms."""
+    shacl_report, *_ = validation_graph.subjects(RDF.type, SH.ValidationReport)
+    return (shacl_report, SH.conforms, Literal(True)) in validation_graph
+
+
+def iter_validation_results(validation_graph: Graph) -> Iterator[ValidationResult]:
+    """Extract the ``sh:ValidationResult``s from a validation graph one by one."""
     shacl_report, *_ = validation_graph.subjects(RDF.type, SH.ValidationReport)
-    validation_report = ValidationReport.from_graph(shacl_report, validation_graph)
+    yield from ValidationReport.iter_results_from_graph(shacl_report, validation_graph)
+
+
+def _format_result(validation_result: ValidationResult, debug=False) -> str:
+    lines = [
+        f"{validation_result.severity}:",
+        f"Breached policy: {validation_result.source_policy.name}",
+        f"{validation_result.source_policy.description}",
+    ]
+    if debug:
+        if validation_result.policy_config_name is not None:
+            lines.append(f"Configured as: {validation_result.policy_config_name}")
+        if validation_result.focus_node is not None:
+            lines.append(f"Focus node: {validation_result.focus_node}")
+        if validation_result.result_path is not None:
+            lines.append(f"Path: {validation_result.result_path}")
+        lines.append(f"Debug: {validation_result.message}")
+    return "".join(f"{line}\n" for line in lines)
+
 
+def format_report(validation_report: ValidationReport, debug=False) -> str:
     if validation_report.conforms:
         return "Validation succeeded!"
 
-    text = "Validation failed!\n"
+    parts = ["Validation failed!\n"]
     for validation_result in validation_report.results:
-        text += "\n"
-        text += f"{validation_result.severity}:\n"
-        text += f"Breached policy: {validation_result.source_policy.name}\n"
-        text += f"{validation_result.source_policy.description}\n"
-        if debug:
-            text += f"Debug: {validation_result.message}\n"
-
-    return text
+        parts.append("\n")
+        parts.append(_format_result(validation_result, debug=debug))
+    return "".join(parts)
+
+
+def result_to_dict(validation_result: ValidationResult) -> Dict[str, Any]:
+    """Convert a validation result into JSON-serializable data."""
+    return {
+        "severity": str(validation_result.severity.level).lower(),
+        "policy": validation_result.source_policy.name,
+        "config_policy": validation_result.policy_config_name,
+        "description": validation_result.source_policy.description,
+        "focus_node": validation_result.focus_node,
+        "path": validation_result.result_path,
+        "message": validation_result.message,
+    }
+
+
+def report_to_dict(validation_report: ValidationReport) -> Dict[str, Any]:
+    """Convert a validation report into JSON-serializable data."""
+    return {
+        "conforms": validation_report.conforms,
+        "results": [result_to_dict(result) for result in validation_report.results],
+    }
+
+
+def create_report(validation_graph: Graph, debug=False) -> str:
+    return format_report(read_validation_report(validation_graph), debug=debug)
+
+
+################################### Report Writers ####################################
+
+
+class ReportWriter:
+    """Writes validation reports of one or more metadata files to a stream.
+
+    Results are written as soon as they are passed in, so that an iterator such as
+    `iter_validation_results` can be used to stream them while they are extracted.
+    Call `start` before the first report and `finish` after the last one.
+    """
+
+    def __init__(self, stream: TextIO, debug=False):
+        self.stream = stream
+        self.debug = debug
+
+    def start(self) -> None:
+        pass
+
+    def write_report(
+        self, source: str, conforms: bool, results: Iterable[ValidationResult]
+    ) -> None:
+        raise NotImplementedError
+
+    def write_error(self, source: str, error: str) -> None:
+        raise NotImplementedError
+
+    def finish(self, summary: Dict[str, int] | None = None) -> None:
+        """Finish the output, optionally with a summary of a batch of files.
+
+        The summary holds the number of files that were ``validated``, ``succeeded``,
+        ``failed``, and ``could_not_be_validated``.
+        """
+        self.stream.flush()
+
+
+class TextReportWriter(ReportWriter):
+    """Writes human-readable reports, as printed by ``software-card-validate``."""
+
+    def __init__(self, stream: TextIO, debug=False, headers=False):
+        super().__init__(stream, debug=debug)
+        #: Whether to write the source above each report
+        self.headers = headers
+
+    def write_report(
+        self, source: str, conforms: bool, results: Iterable[ValidationResult]
+    ) -> None:
+        if self.headers:
+            self.stream.write(f"==> {source} <==\n")
+        if conforms:
+            self.stream.write("Validation succeeded!\n")
+        else:
+            self.stream.write("Validation failed!\n")
+            for validation_result in results:
+                self.stream.write("\n")
+                self.stream.write(_format_result(validation_result, debug=self.debug))
+            self.stream.write("\n")
+        self.stream.flush()
+
+    def write_error(self, source: str, error: str) -> None:
+        if self.headers:
+            self.stream.write(f"==> {source} <==\n")
+        self.stream.write(f"Validation could not be run!\n{error}\n\n")
+        self.stream.flush()
+
+    def finish(self, summary: Dict[str, int] | None = None) -> None:
+        if summary is not None:
+            self.stream.write(
+                f"Validated {summary['validated']} files: {summary['succeeded']} "
+                f"succeeded, {summary['failed']} failed, "
+                f"{summary['could_not_be_validated']} could not be validated.\n"
+            )
+        super().finish()
+
+
+class JSONLinesReportWriter(ReportWriter):
+    """Writes one JSON object per line.
+
+    Every validation result is written as an object of ``"type": "result"`` holding
+    the data of `result_to_dict` and its ``source``. It is followed by an object of
+    ``"type": "report"`` (or ``"type": "error"``) for the file as a whole, and for a
+    batch of files, by a final object of ``"type": "summary"``.
+    """
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps(data) + "\n")
+
+    def write_report(
+        self, source: str, conforms: bool, results: Iterable[ValidationResult]
+    ) -> None:
+        count = 0
+        for validation_result in results:
+            count += 1
+            self._write(
+                {
+                    "type": "result",
+                    "source": source,
+                    **result_to_dict(validation_result),
+                }
+            )
+        self._write(
+            {"type": "report", "source": source, "conforms": conforms, "results": count}
+        )
+        self.stream.flush()
+
+    def write_error(self, source: str, error: str) -> None:
+        self._write({"type": "error", "source": source, "error": error})
+        self.stream.flush()
+
+    def finish(self, summary: Dict[str, int] | None = None) -> None:
+        if summary is not None:
+            self._write({"type": "summary", **summary})
+        super().finish()
+
+
+_SARIF_LEVELS = {"violation": "error", "warning": "warning", "info": "note"}
+
+
+def _artifact_uri(source: str) -> str:
+    """Return the URI of a validated source for a SARIF ``artifactLocation``.
+
+    Local files become ``file:`` URIs, also for records named by their position in a
+    dump (``dump.ttl#record-3``). Other names are kept as relative references.
+    """
+    if is_url(source) or source.startswith("file:"):
+        return source
+    path, _, fragment = source.partition("#")
+    if Path(source).exists():
+        return Path(source).absolute().as_uri()
+    if fragment and Path(path).exists():
+        return f"{Path(path).absolute().as_uri()}#{quote(fragment)}"
+    return quote(source)
+
+
+class SARIFReportWriter(ReportWriter):
+    """Writes a SARIF 2.1.0 log with a single run.
+
+    Each validation result becomes a SARIF result whose rule is the breached policy.
+    The rules are listed in ``tool.driver.rules``, which is written by `finish` after
+    the results. The log is written incrementally, so it is only valid JSON after
+    `finish`.
+    """
+
+    def __init__(self, stream: TextIO, debug=False):
+        super().__init__(stream, debug=debug)
+        self._first_result = True
+        self._errors: List[Dict[str, Any]] = []
+        self._rules: List[Dict[str, Any]] = []
+        self._rule_indices: Dict[str, int] = {}
+
+    def start(self) -> None:
+        self.stream.write(
+            '{"version": "2.1.0", '
+            '"$schema": "https://json.schemastore.org/sarif-2.1.0.json", '
+            '"runs": [{"results": ['
+        )
+
+    def _rule_index(self, rule_id: str, policy) -> int:
+        if rule_id not in self._rule_indices:
+            rule = {"id": rule_id}
+            if policy.name:
+                rule["name"] = policy.name
+            if policy.description:
+                rule["shortDescription"] = {"text": policy.description}
+            self._rule_indices[rule_id] = len(self._rules)
+            self._rules.append(rule)
+        return self._rule_indices[rule_id]
+
+    def _sarif_result(self, source: str, validation_result: ValidationResult):
+        policy = validation_result.source_policy
+        logical_location = {"kind": "object"}
+        if validation_result.focus_node is not None:
+            logical_location["fullyQualifiedName"] = validation_result.focus_node
+        severity = str(validation_result.severity.level).lower()
+        rule_id = policy.name or validation_result.policy_config_name or "unnamed"
+        return {
+            "ruleId": rule_id,
+            "ruleIndex": self._rule_index(rule_id, policy),
+            "level": _SARIF_LEVELS.get(severity, "none"),
+            "message": {"text": policy.description or validation_result.message},
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": _artifact_uri(source)}
+                    },
+                    "logicalLocations": [logical_location],
+                }
+            ],
+            "properties": {
+                "severity": severity,
+                "configPolicy": validation_result.policy_config_name,
+                "focusNode": validation_result.focus_node,
+                "path": validation_result.result_path,
+                "details": validation_result.message,
+            },
+        }
+
+    def write_report(
+        self, source: str, conforms: bool, results: Iterable[ValidationResult]
+    ) -> None:
+        for validation_result in results:
+            if not self._first_result:
+                self.stream.write(", ")
+            self._first_result = False
+            self.stream.write(json.dumps(self._sarif_result(source, validation_result)))
+        self.stream.flush()
+
+    def write_error(self, source: str, error: str) -> None:
+        self._errors.append(
+            {
+                "level": "error",
+                "message": {"text": error},
+                "locations": [
+                    {
+                        "physicalLocation": {
+                            "artifactLocation": {"uri": _artifact_uri(source)}
+                        }
+                    }
+                ],
+            }
+        )
+
+    def finish(self, summary: Dict[str, int] | None = None) -> None:
+        tool = {
+            "driver": {
+                "name": "software-card-validate",
+                "version": __version__,
+                "informationUri": (
+                    "https://github.com/softwarepub/software-card-policies"
+                ),
+                "rules": self._rules,
+            }
+        }
+        invocation = {
+            "executionSuccessful": not self._errors,
+            "toolExecutionNotifications": self._errors,
+        }
+        self.stream.write(
+            f'], "tool": {json.dumps(tool)}, '
+            f'"invocations": [{json.dumps(invocation)}]}}]}}\n'
+        )
+        super().finish()
+
+
+def make_report_writer(
+    format: str, stream: TextIO, debug=False, headers=False
+) -> ReportWriter:
+    """Create a writer for one of the `REPORT_FORMATS`.
+
+    ``headers`` is only used by the text format.
+    """
+    if format == "text":
+        return TextReportWriter(stream, debug=debug, headers=headers)
+    if format == "jsonl":
+        return JSONLinesReportWriter(stream, debug=debug)
+    if format == "sarif":
+        return SARIFReportWriter(stream, debug=debug)
+    raise ValueError(f"Unknown report format '{format}'")
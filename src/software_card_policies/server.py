@@ -0,0 +1,401 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+"""A long-running HTTP service that validates metadata documents.
+
+The configuration and the shapes graph are loaded once at startup and kept warm in a
+pool of worker processes. They are reloaded on ``SIGHUP`` and whenever the
+configuration file changes.
+
+Endpoints:
+
+- ``POST /validate``: Validate the RDF document in the request body. Its format is
+  taken from the ``Content-Type`` header (the default is ``text/turtle``). The report
+  is returned as JSON, or in one of the formats of ``software-card-validate`` if
+  ``?format=text``, ``?format=jsonl`` or ``?format=sarif`` is given.
+- ``GET /health``: Report whether the service is ready.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import signal
+import sys
+import threading
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from typing import Dict, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from rdflib import plugin
+from rdflib.parser import Parser
+from rdflib.plugin import PluginException
+
+from software_card_policies import __version__ as version
+from software_card_policies.arguments import positive_int
+from software_card_policies.batch import init_worker, validate_data
+from software_card_policies.cache import FileCache, default_cache_dir
+from software_card_policies.config import Config, make_config
+from software_card_policies.data_model import (
+    dump_shacl_graph,
+    make_schema_closure,
+    make_shacl_graph,
+)
+from software_card_policies.fetch import Fetcher
+from software_card_policies.report import (
+    REPORT_FORMATS,
+    make_report_writer,
+    report_to_dict,
+)
+
+MAX_BODY_SIZE = 16 * 1024 * 1024
+"""Maximum accepted size of a request body in bytes."""
+
+_CONTENT_TYPES = {
+    "text": "text/plain; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "sarif": "application/sarif+json",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str | None = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class ValidationService:
+    """Keeps the shapes graph of a config warm in a pool of worker processes."""
+
+    def __init__(
+        self,
+        config_file: Path,
+        jobs: int = 1,
+        shapes_cache: FileCache | None = None,
+        fetcher: Fetcher | None = None,
+        results_cache: FileCache | None = None,
+    ):
+        self.config_file = config_file
+        self.jobs = jobs
+        self.shapes_cache = shapes_cache
+        self.fetcher = fetcher
+        self.results_cache = results_cache
+        self.config: Config | None = None
+        self._config_mtime: float | None = None
+        self._executor: ProcessPoolExecutor | None = None
+        self._semaphore = asyncio.Semaphore(jobs)
+        # Executors replaced by `load` are shut down once their pending requests are
+        # done. `load` runs in another thread than `validate`.
+        self._executor_lock = threading.Lock()
+        self._pending: Dict[ProcessPoolExecutor, int] = {}
+        self._retired: Set[ProcessPoolExecutor] = set()
+
+    def load(self) -> None:
+        """Load the config and the shapes graph and start new worker processes."""
+        config_mtime = self.config_file.stat().st_mtime
+        config = make_config(config_file=self.config_file)
+        shapes_graph = make_shacl_graph(
+            config, cache=self.shapes_cache, fetcher=self.fetcher
+        )
+        shapes_data = dump_shacl_graph(shapes_graph)
+        schema = make_schema_closure(
+            config, cache=self.shapes_cache, fetcher=self.fetcher
+        )
+        schema_data = schema.dump() if schema is not None else None
+        # Spawn rather than fork the workers so that they don't inherit the event loop
+        # and the listening sockets.
+        executor = ProcessPoolExecutor(
+            max_workers=self.jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=partial(init_worker, fetcher=self.fetcher),
+            initargs=(shapes_data, config.inference, schema_data, self.results_cache),
+        )
+        with self._executor_lock:
+            old_executor = self._executor
+            self.config, self._config_mtime = config, config_mtime
+            self._executor = executor
+            if old_executor is not None:
+                # Requests which are already running finish with the old shapes.
+                if self._pending.get(old_executor):
+                    self._retired.add(old_executor)
+                else:
+                    old_executor.shutdown(wait=False)
+
+    async def reload(self) -> None:
+        try:
+            await asyncio.to_thread(self.load)
+        except Exception as e:
+            print(f"Reloading failed, keeping previous policies: {e}", file=sys.stderr)
+            return
+        print("Reloaded policies", file=sys.stderr)
+
+    def config_changed(self) -> bool:
+        try:
+            return self.config_file.stat().st_mtime != self._config_mtime
+        except FileNotFoundError:
+            return False
+
+    async def watch_config(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            if self.config_changed():
+                await self.reload()
+
+    async def validate(self, data: bytes, format: str):
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            with self._executor_lock:
+                executor = self._executor
+                self._pending[executor] = self._pending.get(executor, 0) + 1
+            try:
+                return await loop.run_in_executor(executor, validate_data, data, format)
+            finally:
+                self._release(executor)
+
+    def _release(self, executor: ProcessPoolExecutor) -> None:
+        with self._executor_lock:
+            self._pending[executor] -= 1
+            if self._pending[executor] == 0:
+                del self._pending[executor]
+                if executor in self._retired:
+                    self._retired.discard(executor)
+                    executor.shutdown(wait=False)
+
+    def close(self) -> None:
+        with self._executor_lock:
+            executors = [*self._retired, self._executor]
+            self._retired.clear()
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown()
+
+    async def handle_request(
+        self, method: str, target: str, headers: dict, body: bytes
+    ) -> Tuple[HTTPStatus, str, bytes]:
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+
+        if url.path == "/health":
+            if method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+            status = {"status": "ok", "policies": list(self.config.policies)}
+            return HTTPStatus.OK, "application/json", json.dumps(status).encode()
+
+        if url.path != "/validate":
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        if method != "POST":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+        content_type = headers.get("content-type", "text/turtle")
+        format = content_type.split(";")[0].strip()
+        try:
+            plugin.get(format, Parser)
+        except PluginException:
+            raise HTTPError(
+                HTTPStatus.UNSUPPORTED_MEDIA_TYPE, f"Unsupported format '{format}'"
+            )
+        result = await self.validate(body, format)
+        if result.error is not None:
+            if result.unreadable:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, result.error)
+            raise HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR, result.error)
+
+        report_format = query.get("format", ["json"])[0]
+        if report_format in REPORT_FORMATS:
+            stream = StringIO()
+            debug = query.get("debug") == ["true"]
+            writer = make_report_writer(report_format, stream, debug=debug)
+            writer.start()
+            writer.write_report(
+                result.source, result.report.conforms, result.report.results
+            )
+            writer.finish()
+            content_type = _CONTENT_TYPES[report_format]
+            return HTTPStatus.OK, content_type, stream.getvalue().encode()
+        if report_format != "json":
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST, f"Unknown report format '{report_format}'"
+            )
+        data = json.dumps(report_to_dict(result.report))
+        return HTTPStatus.OK, "application/json", data.encode()
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            try:
+                method, target, headers, body = await _read_request(reader)
+                status, content_type, data = await self.handle_request(
+                    method, target, headers, body
+                )
+            except HTTPError as e:
+                status, content_type = e.status, "application/json"
+                data = json.dumps({"error": str(e)}).encode()
+            except Exception as e:
+                status = HTTPStatus.INTERNAL_SERVER_ERROR
+                content_type = "application/json"
+                data = json.dumps({"error": f"{type(e).__name__}: {e}"}).encode()
+            head = (
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1") + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    try:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, target, _version = request_line.split(" ", 2)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    while line := (await reader.readline()).decode("latin-1").strip():
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        content_length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed Content-Length")
+    if content_length > MAX_BODY_SIZE:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    body = await reader.readexactly(content_length)
+    return method, target, headers, body
+
+
+async def serve(service: ValidationService, host: str, port: int, interval: float):
+    """Serve until ``SIGINT`` or ``SIGTERM`` is received."""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    loop.add_signal_handler(signal.SIGINT, stop.set)
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    loop.add_signal_handler(
+        signal.SIGHUP, lambda: asyncio.ensure_future(service.reload())
+    )
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    address = ", ".join(str(socket.getsockname()) for socket in server.sockets)
+    print(f"Serving on {address}", file=sys.stderr)
+    watcher = asyncio.create_task(service.watch_config(interval)) if interval else None
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+
+
+def make_argument_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="software-card-serve",
+        description="Serve validation of publication metadata via HTTP.",
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        help="configuration file (the default is config.toml)",
+        type=Path,
+        default=Path("config.toml"),
+        metavar="CONFIG_FILE",
+    )
+    parser.add_argument(
+        "--host",
+        help="address to listen on (the default is 127.0.0.1)",
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--port",
+        help="port to listen on (the default is 8080)",
+        type=int,
+        default=8080,
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="number of concurrent validations (the default is 1)",
+        type=positive_int,
+        default=1,
+        metavar="JOBS",
+    )
+    parser.add_argument(
+        "--reload-interval",
+        help=(
+            "seconds between checks of the configuration file for changes; 0 disables "
+            "the checks (the default is 5)"
+        ),
+        type=float,
+        default=5,
+        metavar="SECONDS",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=f"directory for cached data (the default is {default_cache_dir()})",
+        type=Path,
+        default=default_cache_dir(),
+        metavar="CACHE_DIR",
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="do not read or write cached shapes graphs, policies, and results",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--offline",
+        help="only use cached copies of remote policies",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-v",
+        "--version",
+        action="version",
+        version=f"%(prog)s {version}",
+    )
+    return parser
+
+
+def main():
+    parser = make_argument_parser()
+    arguments = parser.parse_args()
+
+    shapes_cache = FileCache(arguments.cache_dir / "shapes")
+    policies_cache = FileCache(arguments.cache_dir / "policies")
+    results_cache = FileCache(arguments.cache_dir / "results")
+    if arguments.no_cache:
+        shapes_cache = policies_cache = results_cache = None
+
+    try:
+        fetcher = Fetcher(cache=policies_cache, offline=arguments.offline)
+        service = ValidationService(
+            arguments.config,
+            jobs=arguments.jobs,
+            shapes_cache=shapes_cache,
+            fetcher=fetcher,
+            results_cache=results_cache,
+        )
+        service.load()
+    except Exception as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+
+    try:
+        asyncio.run(
+            serve(service, arguments.host, arguments.port, arguments.reload_interval)
+        )
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
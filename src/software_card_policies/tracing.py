@@ -0,0 +1,111 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+"""Lightweight tracing of the phases of a validation.
+
+The library records spans for its phases (fetching and parameterizing policies,
+validating, ...) whenever a `Tracer` is active::
+
+    with tracing() as tracer:
+        shacl_graph = make_shacl_graph(config)
+        validate_graph(data_graph, shacl_graph)
+    print(tracer.to_dict())
+
+If no tracer is active, recording a span costs next to nothing.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List
+
+
+@dataclass
+class Span:
+    """A named phase with its duration and attributes such as triple counts."""
+
+    name: str
+    #: Start of the span in seconds since the start of the tracer
+    start: float
+    duration: float | None = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    children: List["Span"] = field(default_factory=list)
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "start": self.start,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class _NoSpan:
+    """Stand-in for a span while tracing is disabled."""
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """Collects the spans recorded while it is active (see `tracing`).
+
+    If given, ``on_span`` is called with every span once it has finished.
+    """
+
+    def __init__(self, on_span: Callable[[Span], None] | None = None):
+        self.on_span = on_span
+        self.spans: List[Span] = []
+        self._start = time.perf_counter()
+        self._parent: ContextVar[Span | None] = ContextVar("parent", default=None)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        start = time.perf_counter()
+        span = Span(name, start - self._start, attributes=attributes)
+        parent = self._parent.get()
+        (parent.children if parent is not None else self.spans).append(span)
+        token = self._parent.set(span)
+        try:
+            yield span
+        finally:
+            self._parent.reset(token)
+            span.duration = time.perf_counter() - start
+            if self.on_span is not None:
+                self.on_span(span)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"spans": [span.to_dict() for span in self.spans]}
+
+
+_tracer: ContextVar[Tracer | None] = ContextVar("tracer", default=None)
+
+
+@contextmanager
+def tracing(tracer: Tracer | None = None) -> Iterator[Tracer]:
+    """Activate ``tracer`` (or a new one) for the duration of the block."""
+    tracer = tracer if tracer is not None else Tracer()
+    token = _tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _tracer.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span | _NoSpan]:
+    """Record a span using the active tracer, if any."""
+    if (tracer := _tracer.get()) is None:
+        yield _NO_SPAN
+        return
+    with tracer.span(name, **attributes) as new_span:
+        yield new_span
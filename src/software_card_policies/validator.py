@@ -0,0 +1,148 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+"""A reusable validator for embedding validation into other applications.
+
+A `Validator` loads the policies of a config once and then validates any number of
+metadata documents, also when it is shared between threads::
+
+    validator = Validator(make_config(config_file=Path("config.toml")))
+    conforms, validation_graph = validator.validate(Path("codemeta.json"))
+    report = validator.report(request_body, format="json-ld")
+"""
+
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Tuple
+
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDF, SH
+
+from software_card_policies.cache import FileCache
+from software_card_policies.config import Config
+from software_card_policies.data_model import (
+    SeverityLevel,
+    ValidationReport,
+    make_schema_closure,
+    make_shacl_graph,
+    read_rdf_resource,
+    validate_graph,
+)
+from software_card_policies.fetch import Fetcher
+from software_card_policies.javascript import JSRuntime
+from software_card_policies.report import read_validation_report
+
+
+class Validator:
+    """Validates metadata against the policies of ``config``.
+
+    The shapes graph and the `SchemaClosure` of the config are created once, using
+    ``fetcher`` and ``shapes_cache``. Validation graphs are cached in
+    ``results_cache``, and ``min_severity`` and ``fail_fast`` are passed on to
+    `validate_graph`. SHACL-JS code is run using a `JSRuntime` of the validator, which
+    keeps warm contexts per thread.
+
+    The validator doesn't change after it has been created, so it can be shared between
+    threads. The metadata is read concurrently, but the validations of each validator
+    run one at a time, as validating is CPU-bound and threads competing for the GIL
+    validate slower than one thread does. Different validators validate concurrently,
+    except for the parsing of SPARQL queries, as rdflib's SPARQL parser isn't
+    thread-safe, and the validations of policies defining SHACL functions, which
+    pyshacl registers with rdflib for the whole process. Use `batch.validate_sources`
+    to validate in parallel.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        fetcher: Fetcher | None = None,
+        shapes_cache: FileCache | None = None,
+        results_cache: FileCache | None = None,
+        min_severity: SeverityLevel = SeverityLevel.INFO,
+        fail_fast: bool = False,
+    ):
+        fetcher = fetcher or Fetcher()
+        self.config = config
+        self.shapes_graph = make_shacl_graph(
+            config, cache=shapes_cache, fetcher=fetcher
+        )
+        self.schema = make_schema_closure(config, cache=shapes_cache, fetcher=fetcher)
+        self.results_cache = results_cache
+        self.min_severity = min_severity
+        self.fail_fast = fail_fast
+        self.js_runtime = JSRuntime(fetcher)
+        self._defines_functions = any(
+            (None, RDF.type, function_type) in self.shapes_graph
+            for function_type in _FUNCTION_TYPES
+        )
+        self._lock = threading.Lock()
+        _install_sparql_parser_lock()
+
+    def read(self, data: Graph | bytes | Path | str, format: str = "turtle") -> Graph:
+        """Read the metadata to validate.
+
+        ``data`` is a graph, the serialized metadata in ``format``, or a local file or
+        URL, whose format is guessed from its name.
+        """
+        if isinstance(data, Graph):
+            return data
+        if isinstance(data, bytes):
+            return read_rdf_resource(format=format, data=data)
+        return read_rdf_resource(data)
+
+    def validate(
+        self, data: Graph | bytes | Path | str, format: str = "turtle"
+    ) -> Tuple[bool, Graph]:
+        """Validate the metadata ``data`` (see `read`) like `validate_graph` does."""
+        data_graph = self.read(data, format)
+        functions_lock = _functions_lock if self._defines_functions else nullcontext()
+        with self._lock, functions_lock:
+            return validate_graph(
+                data_graph,
+                self.shapes_graph,
+                inference=self.config.inference,
+                schema=self.schema,
+                js_runtime=self.js_runtime,
+                cache=self.results_cache,
+                min_severity=self.min_severity,
+                fail_fast=self.fail_fast,
+            )
+
+    def report(
+        self, data: Graph | bytes | Path | str, format: str = "turtle"
+    ) -> ValidationReport:
+        """Validate the metadata ``data`` and return the report."""
+        _conforms, validation_graph = self.validate(data, format)
+        return read_validation_report(validation_graph)
+
+
+# Types of the SHACL functions which pyshacl registers with rdflib while it validates.
+_FUNCTION_TYPES = (SH.SPARQLFunction, SH.JSFunction, URIRef(f"{SH}SHACLFunction"))
+_functions_lock = threading.Lock()
+
+# rdflib's SPARQL parser, which pyshacl uses for SPARQL-based constraints, isn't
+# thread-safe, as pyparsing adapts parse actions to their signatures when they are
+# first called.
+_sparql_parser_lock = threading.Lock()
+
+
+def _install_sparql_parser_lock() -> None:
+    """Make rdflib parse SPARQL queries and updates one at a time."""
+    from rdflib.plugins.sparql import processor
+
+    with _sparql_parser_lock:
+        if getattr(processor.parseQuery, "uses_lock", False):
+            return
+        for name in ("parseQuery", "parseUpdate"):
+            setattr(processor, name, _locked(getattr(processor, name)))
+
+
+def _locked(parse):
+    def parse_locked(*args, **kwargs):
+        with _sparql_parser_lock:
+            return parse(*args, **kwargs)
+
+    parse_locked.uses_lock = True
+    return parse_locked
@@ -0,0 +1,49 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+from typing import Dict
+
+from rdflib.namespace import SH
+from rdflib.term import URIRef
+
+from software_card_policies.rdf_helpers import select_language
+
+# The following labels and comments are extracted from the SHACL vocabulary
+# (http://www.w3.org/ns/shacl#) so that it doesn't have to be downloaded and parsed in
+# order to create a report. Only the terms used in reports are included.
+
+SHACL_LABELS: Dict[URIRef, Dict[str | None, str]] = {
+    SH.Severity: {"en": "Severity"},
+    SH.Info: {"en": "Info"},
+    SH.Warning: {"en": "Warning"},
+    SH.Violation: {"en": "Violation"},
+    SH.ValidationReport: {"en": "Validation report"},
+    SH.ValidationResult: {"en": "Validation result"},
+}
+"""Labels of SHACL terms by language."""
+
+SHACL_COMMENTS: Dict[URIRef, Dict[str | None, str]] = {
+    SH.Severity: {
+        "en": (
+            "The class of validation result severity levels, including violation and "
+            "warning levels."
+        )
+    },
+    SH.Info: {"en": "The severity for an informational validation result."},
+    SH.Warning: {"en": "The severity for a warning validation result."},
+    SH.Violation: {"en": "The severity for a violation validation result."},
+    SH.ValidationReport: {"en": "The class of SHACL validation reports."},
+    SH.ValidationResult: {"en": "The class of validation results."},
+}
+"""Comments of SHACL terms by language."""
+
+
+def get_label(term: URIRef, language=None) -> str | None:
+    """Get the label of a SHACL term, preferably in the given language."""
+    return select_language(SHACL_LABELS.get(term, {}), language)
+
+
+def get_comment(term: URIRef, language=None) -> str | None:
+    """Get the comment of a SHACL term, preferably in the given language."""
+    return select_language(SHACL_COMMENTS.get(term, {}), language)
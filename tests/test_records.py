@@ -0,0 +1,59 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+import pytest
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDF, SDO
+
+from software_card_policies.records import _split_ntriples_line, split_records
+
+
+@pytest.mark.parametrize(
+    "line, terms",
+    [
+        (
+            "<https://e.org/s> <https://e.org/p> <https://e.org/o> .",
+            ("<https://e.org/s>", "<https://e.org/p>", "<https://e.org/o>"),
+        ),
+        (
+            "<https://e.org/s><https://e.org/p><https://e.org/o>.",
+            ("<https://e.org/s>", "<https://e.org/p>", "<https://e.org/o>"),
+        ),
+        (
+            '_:b1<https://e.org/p>"a \\" b"@en.# comment',
+            ("_:b1", "<https://e.org/p>", '"a \\" b"@en'),
+        ),
+        (
+            '<https://e.org/s> <https://e.org/p> "1"^^<https://e.org/t> . # comment',
+            ("<https://e.org/s>", "<https://e.org/p>", '"1"^^<https://e.org/t>'),
+        ),
+        (
+            "<https://e.org/s> <https://e.org/p> _:b2.",
+            ("<https://e.org/s>", "<https://e.org/p>", "_:b2"),
+        ),
+        ("# comment", None),
+        ("   ", None),
+    ],
+)
+def test_split_ntriples_line(line, terms):
+    assert _split_ntriples_line(line) == terms
+
+
+def test_split_ntriples_line_rejects_invalid_lines():
+    with pytest.raises(ValueError):
+        _split_ntriples_line("<https://e.org/s> <https://e.org/p> .")
+
+
+def test_split_records_without_whitespace(tmp_path):
+    dump = tmp_path / "dump.nt"
+    dump.write_text(
+        f"<https://e.org/a><{RDF.type}><{SDO.SoftwareSourceCode}>.\n"
+        f'<https://e.org/a><{SDO.name}>"A".\n'
+        f"<https://e.org/b><{RDF.type}><{SDO.SoftwareSourceCode}>.\n",
+        encoding="utf-8",
+    )
+    records = dict(split_records(dump))
+    assert sorted(records) == ["https://e.org/a", "https://e.org/b"]
+    graph = Graph().parse(data=records["https://e.org/a"], format="nt")
+    assert graph.value(URIRef("https://e.org/a"), SDO.name).value == "A"
@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+import io
+import json
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+import pytest
+
+from software_card_policies.data_model import (
+    Policy,
+    Severity,
+    SeverityLevel,
+    ValidationResult,
+)
+from software_card_policies.report import SARIFReportWriter
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+def _result(name, description="", level=SeverityLevel.VIOLATION):
+    return ValidationResult(
+        severity=Severity(label="", comment="", level=level),
+        message=f"{name} is not satisfied",
+        source_policy=Policy(name=name, description=description),
+        policy_config_name=name,
+        focus_node="https://example.org/software",
+    )
+
+
+@pytest.fixture
+def sarif_log(tmp_path):
+    metadata = tmp_path / "my metadata.ttl"
+    metadata.touch()
+    stream = io.StringIO()
+    writer = SARIFReportWriter(stream)
+    writer.start()
+    writer.write_report(
+        str(metadata),
+        False,
+        [_result("license", "Has a license"), _result("version", "Has a version")],
+    )
+    writer.write_report(
+        f"{metadata}#record-2",
+        False,
+        [_result("license", "Has a license", SeverityLevel.WARNING)],
+    )
+    writer.write_error("missing.ttl", "File not found")
+    writer.finish()
+    return json.loads(stream.getvalue())
+
+
+def test_sarif_rules(sarif_log):
+    (run,) = sarif_log["runs"]
+    rules = run["tool"]["driver"]["rules"]
+    assert [rule["id"] for rule in rules] == ["license", "version"]
+    assert rules[0]["shortDescription"] == {"text": "Has a license"}
+    for result in run["results"]:
+        assert rules[result["ruleIndex"]]["id"] == result["ruleId"]
+
+
+def test_sarif_artifact_uris(sarif_log, tmp_path):
+    (run,) = sarif_log["runs"]
+    uris = [
+        result["locations"][0]["physicalLocation"]["artifactLocation"]["uri"]
+        for result in run["results"]
+    ]
+    file_uri = (tmp_path / "my metadata.ttl").as_uri()
+    assert uris == [file_uri, file_uri, f"{file_uri}#record-2"]
+    assert all(" " not in uri and urlsplit(uri).scheme == "file" for uri in uris)
+    (error,) = run["invocations"][0]["toolExecutionNotifications"]
+    assert error["locations"][0]["physicalLocation"]["artifactLocation"] == {
+        "uri": "missing.ttl"
+    }
+
+
+def test_sarif_schema(sarif_log):
+    jsonschema = pytest.importorskip("jsonschema")
+    try:
+        with urlopen(SARIF_SCHEMA, timeout=10) as response:
+            schema = json.load(response)
+    except OSError as e:
+        pytest.skip(f"SARIF schema could not be fetched: {e}")
+    jsonschema.validate(sarif_log, schema)
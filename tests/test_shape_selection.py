@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2025 Helmholtz-Zentrum Dresden - Rossendorf (HZDR)
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileContributor: David Pape
+
+from rdflib import Graph
+from rdflib.namespace import SH
+
+from software_card_policies.data_model import SeverityLevel, validate_graph
+
+PREFIXES = """
+@prefix ex: <http://example.org/> .
+@prefix schema: <http://schema.org/> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+"""
+
+NESTED_SHAPES = """
+ex:A a sh:NodeShape ;
+    sh:targetClass schema:SoftwareSourceCode ;
+    sh:property [ sh:path schema:author ; sh:node ex:P ] .
+
+ex:P a sh:NodeShape ;
+    sh:targetClass schema:Person ;
+    sh:property [ sh:path schema:name ; sh:minCount 1 ] .
+"""
+
+
+def parse(data: str) -> Graph:
+    return Graph().parse(data=PREFIXES + data, format="turtle")
+
+
+def test_nested_shape_with_unmatched_target_is_validated():
+    data_graph = parse("ex:s a schema:SoftwareSourceCode ; schema:author ex:bob .")
+    conforms, _validation_graph = validate_graph(
+        data_graph, parse(NESTED_SHAPES), inference="none"
+    )
+    assert not conforms
+
+
+def test_nested_shape_with_unmatched_target_passes_valid_data():
+    data_graph = parse(
+        """
+        ex:s a schema:SoftwareSourceCode ; schema:author ex:bob .
+        ex:bob schema:name "Bob" .
+        """
+    )
+    conforms, _validation_graph = validate_graph(
+        data_graph, parse(NESTED_SHAPES), inference="none"
+    )
+    assert conforms
+
+
+def test_untargeted_nested_shape_is_validated():
+    shacl_graph = parse(
+        """
+        ex:A a sh:NodeShape ;
+            sh:targetClass schema:SoftwareSourceCode ;
+            sh:property [ sh:path schema:author ; sh:node ex:Q ] .
+
+        ex:Q a sh:NodeShape ;
+            sh:property [ sh:path schema:name ; sh:minCount 1 ] .
+
+        ex:B a sh:NodeShape ;
+            sh:targetClass schema:Dataset ;
+            sh:property [ sh:path schema:name ; sh:minCount 1 ] .
+        """
+    )
+    data_graph = parse("ex:s a schema:SoftwareSourceCode ; schema:author ex:bob .")
+    conforms, _validation_graph = validate_graph(
+        data_graph, shacl_graph, inference="none"
+    )
+    assert not conforms
+
+
+def test_nested_shape_below_min_severity_is_validated():
+    shacl_graph = parse(
+        """
+        ex:A a sh:NodeShape ;
+            sh:targetClass schema:SoftwareSourceCode ;
+            sh:property [ sh:path schema:author ; sh:node ex:P ] .
+
+        ex:P a sh:NodeShape ;
+            sh:targetClass schema:Person ;
+            sh:severity sh:Info ;
+            sh:property [ sh:path schema:name ; sh:minCount 1 ] .
+        """
+    )
+    data_graph = parse(
+        """
+        ex:s a schema:SoftwareSourceCode ; schema:author ex:bob .
+        ex:bob a schema:Person .
+        """
+    )
+    conforms, validation_graph = validate_graph(
+        data_graph,
+        shacl_graph,
+        inference="none",
+        min_severity=SeverityLevel.WARNING,
+    )
+    assert not conforms
+    # The result of ex:P for ex:bob itself is an info, so it is dropped.
+    assert set(validation_graph.objects(None, SH.resultSeverity)) == {SH.Violation}